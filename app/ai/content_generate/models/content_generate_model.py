@@ -28,4 +28,5 @@ class ContentGenerateResponse(BaseModel):
     token_limit: int = Field(..., description="Maximum allowed tokens")
     token_count: int = Field(..., description="Number of tokens used")
     remaining_tokens: int = Field(..., description="Remaining tokens available")
-    text_used: str = Field(..., description="The text used for generation") 
\ No newline at end of file
+    text_used: Optional[str] = Field(None, description="The text used for generation, only included when echo is requested")
+    text_used_sha256: str = Field(..., description="SHA-256 hex digest of the text used for generation") 
\ No newline at end of file
@@ -1,41 +1,67 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from app.ai.content_generate.models.content_generate_model import ContentGenerateRequest, ContentGenerateResponse, GeneratedContent
 from app.ai.content_generate.services.content_generate_service import ContentGenerateService
-from app.ai.core.services.ai_core_service import AIService, OpenAIServiceError
-from app.ai.core.services.tokenizer_core_service import TokenizerService, TokenizerError
-from app.config.settings import OpenAISettings
+from app.ai.core.services.ai_core_service import get_shared_ai_service, OpenAIServiceError
+from app.ai.core.services.tokenizer_core_service import TokenInfo, TokenizerService, TokenizerError
+from app.config.settings import get_settings
 from app.shared.logging import get_logger
-import traceback
-from typing import Dict, Any, List
+from app.shared.cache import LRUCache, SingleFlight, content_key
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, Any, List, AsyncIterator
 
 # Set up module logger
 logger = get_logger("content_generate_router")
 
+# Logger for the current request, set once by the endpoints and read by the helpers
+request_logger: ContextVar[logging.Logger] = ContextVar("request_logger", default=logger)
+
 router = APIRouter(
     prefix="/content-generate",
     tags=["content-generate"],
 )
 
 # Initialize settings first
-openai_settings = OpenAISettings()
+openai_settings = get_settings()
 
 # Create service instances with dependencies
 tokenizer_service = TokenizerService(openai_settings)
-ai_service = AIService(openai_settings)
+ai_service = get_shared_ai_service(openai_settings)
 content_generate_service = ContentGenerateService()
 
+# Bounds concurrent LLM calls across all requests to stay within account rate limits
+llm_semaphore = asyncio.Semaphore(openai_settings.llm_max_concurrency)
+
+# Identical generations already in flight, shared by concurrent callers
+inflight_generations = SingleFlight()
+
+# First level-one markdown header, used as the fallback title
+H1_TITLE_PATTERN = re.compile(r'^# (.+)$', re.MULTILINE)
+
+# Streamed deltas are buffered and flushed once either limit is reached
+STREAM_FLUSH_INTERVAL_SECONDS = 0.05
+STREAM_FLUSH_SIZE = 4096
+
+# Token validation results keyed on a digest of the source text
+token_info_cache = LRUCache(maxsize=512)
+
 # Custom exception for router-specific errors
 class ContentGenerateRouterError(Exception):
     """Custom exception for content generation router errors"""
     pass
 
-def validate_token_count(text: str, req_logger = logger) -> Dict[str, Any]:
+def validate_token_count(text: str) -> TokenInfo:
     """
     Validate text against token limits
     
     Args:
         text: Text to validate
-        req_logger: Logger to use for this request
         
     Returns:
         Dictionary with token information
@@ -43,89 +69,138 @@ def validate_token_count(text: str, req_logger = logger) -> Dict[str, Any]:
     Raises:
         ContentGenerateRouterError: If token validation fails
     """
+    req_logger = request_logger.get()
     try:
         # Log input details
-        req_logger.debug(f"Validating tokens for text length: {len(text)}")
+        if req_logger.isEnabledFor(logging.DEBUG):
+            req_logger.debug("Validating tokens for text length: %d", len(text))
         
-        # Validate tokens using tokenizer service
-        token_info = tokenizer_service.validate_tokens(text)
+        # Reuse the token information if this text has been validated before
+        text_key = content_key(text)
+        token_info = token_info_cache.get(text_key)
+        if token_info is None:
+            # Validate tokens using tokenizer service
+            token_info = tokenizer_service.validate_tokens(text)
+            token_info_cache.set(text_key, token_info)
         
         # Log token counts and model info
-        req_logger.info(f"Token count: {token_info['token_count']}/{token_info['model_limit']} ({token_info['percentage_used']}%)")
+        req_logger.info(
+            "Token count: %s/%s (%s%%)",
+            token_info['token_count'], token_info['model_limit'], token_info['percentage_used']
+        )
         
         # Return token information
         return token_info
         
     except TokenizerError as e:
-        req_logger.error(f"Tokenizer error: {str(e)}")
+        req_logger.error("Tokenizer error: %s", e)
         raise ContentGenerateRouterError(f"Tokenizer error: {str(e)}")
     except Exception as e:
-        req_logger.error(f"Unexpected error in token validation: {str(e)}")
+        req_logger.error("Unexpected error in token validation: %s", e)
         if isinstance(e, ContentGenerateRouterError):
             raise
         raise ContentGenerateRouterError(f"Error validating token count: {str(e)}")
 
-async def generate_content_for_type(
+async def _generate_uncached_content(
     content_type: str,
     title: str,
     intent: str,
     text: str,
-    req_logger = logger
+    cache_key: str
 ) -> str:
     """
-    Generate content for a specific content type
+    Call the LLM to generate content for a specific content type and cache it
     
     Args:
         content_type: Content type to generate
         title: Optional title for the content
         intent: Customer intent statement
         text: Source text
-        req_logger: Logger to use for this request
+        cache_key: Cache key for the generation inputs
         
     Returns:
         Generated content in markdown format
         
     Raises:
-        ContentGenerateRouterError: If content generation fails
+        ContentGenerateRouterError: If the LLM returns an empty response
+        OpenAIServiceError: If the AI service call fails
     """
-    try:
-        # Format the prompt
-        req_logger.info(f"Generating content for type: {content_type}")
-        prompt = content_generate_service.format_content_generate_prompt(
-            content_type=content_type,
-            intent=intent,
-            text=text,
-            title=title
-        )
-        
-        # Generate completion
-        req_logger.info("Calling AI service")
+    req_logger = request_logger.get()
+    
+    # Format the prompt
+    req_logger.info("Generating content for type: %s", content_type)
+    prompt = content_generate_service.format_content_generate_prompt(
+        content_type=content_type,
+        intent=intent,
+        text=text,
+        title=title
+    )
+    
+    # Generate completion
+    req_logger.info("Calling AI service")
+    async with llm_semaphore:
         completion = await ai_service.generate_completion(
             messages=prompt["messages"]
         )
+    
+    # Extract content
+    generated_content = completion.get('text', '')
+    
+    if not generated_content:
+        raise ContentGenerateRouterError("Empty response from LLM")
         
-        # Extract content
-        generated_content = completion.get('text', '')
+    req_logger.info("Generated %d characters of content", len(generated_content))
+    content_generate_service.cache_content(cache_key, generated_content)
+    return generated_content
+
+async def generate_content_for_type(
+    content_type: str,
+    title: str,
+    intent: str,
+    text: str
+) -> str:
+    """
+    Generate content for a specific content type
+    
+    Args:
+        content_type: Content type to generate
+        title: Optional title for the content
+        intent: Customer intent statement
+        text: Source text
         
-        if not generated_content:
-            raise ContentGenerateRouterError("Empty response from LLM")
-            
-        req_logger.info(f"Generated {len(generated_content)} characters of content")
-        return generated_content
+    Returns:
+        Generated content in markdown format
+        
+    Raises:
+        ContentGenerateRouterError: If content generation fails
+    """
+    req_logger = request_logger.get()
+    try:
+        # Return previously generated content for identical inputs
+        cache_key = content_generate_service.get_cache_key(content_type, intent, text, title)
+        cached_content = content_generate_service.get_cached_or_none(cache_key)
+        if cached_content is not None:
+            req_logger.info("Using cached content for type: %s", content_type)
+            return cached_content
+        
+        # Join an identical generation that is already running, or start one
+        return await inflight_generations.do(
+            cache_key,
+            lambda: _generate_uncached_content(content_type, title, intent, text, cache_key)
+        )
             
     except OpenAIServiceError as e:
-        req_logger.error(f"AI service error: {str(e)}")
+        req_logger.error("AI service error: %s", e)
         raise ContentGenerateRouterError(f"AI service error: {str(e)}")
     except Exception as e:
-        req_logger.error(f"Error generating content: {str(e)}")
+        req_logger.error("Error generating content: %s", e)
         if isinstance(e, ContentGenerateRouterError):
             raise
         raise ContentGenerateRouterError(f"Error generating content: {str(e)}")
 
 async def generate_all_content(
     request: ContentGenerateRequest,
-    token_info: Dict[str, Any],
-    req_logger = logger
+    token_info: TokenInfo
 ) -> List[GeneratedContent]:
     """
     Generate content for all requested content types
@@ -133,7 +208,6 @@ async def generate_all_content(
     Args:
         request: The content generation request
         token_info: Token information
-        req_logger: Logger to use for this request
         
     Returns:
         List of generated content items
@@ -141,38 +215,49 @@ async def generate_all_content(
     Raises:
         ContentGenerateRouterError: If content generation fails
     """
-    # Initialize result list
-    generated_content_list = []
-    
-    # Process each content type
-    for content_type_request in request.content_types:
-        try:
-            # Generate content for this type
-            content = await generate_content_for_type(
+    # Dispatch all content types concurrently; each call is I/O bound on the LLM round trip.
+    # gather cancels every generation if this request is cancelled, while
+    # return_exceptions keeps one failed type from cancelling its siblings.
+    results = await asyncio.gather(
+        *(
+            generate_content_for_type(
                 content_type=content_type_request.type,
                 title=content_type_request.title,
                 intent=request.intent,
-                text=request.text_used,
-                req_logger=req_logger
+                text=request.text_used
             )
-            
-            # Extract title from content (first h1 header)
-            title_lines = [line.replace('# ', '') for line in content.split('\n') if line.startswith('# ')]
-            title = content_type_request.title or (title_lines[0] if title_lines else "Untitled")
-            
-            # Add to result list
-            generated_content_list.append(
-                GeneratedContent(
-                    type=content_type_request.type,
-                    title=title,
-                    content=content
-                )
-            )
-            
-        except Exception as e:
-            req_logger.error(f"Error generating content for type {content_type_request.type}: {str(e)}")
-            req_logger.error(f"Continuing with other content types")
+            for content_type_request in request.content_types
+        ),
+        return_exceptions=True
+    )
+    
+    # Collect results in request order
+    req_logger = request_logger.get()
+    generated_content_list = []
+    for content_type_request, content in zip(request.content_types, results):
+        if isinstance(content, asyncio.CancelledError):
+            req_logger.error("Content generation for type %s was cancelled", content_type_request.type)
+            continue
+        if isinstance(content, Exception):
+            req_logger.error("Error generating content for type %s: %s", content_type_request.type, content)
+            req_logger.error("Continuing with other content types")
             # Continue with other content types even if one fails
+            continue
+        
+        # Use the requested title, otherwise extract it from content (first h1 header)
+        title = content_type_request.title
+        if not title:
+            title_match = H1_TITLE_PATTERN.search(content)
+            title = title_match.group(1) if title_match else "Untitled"
+        
+        # Add to result list; fields are strings we produced, so skip revalidation
+        generated_content_list.append(
+            GeneratedContent.model_construct(
+                type=content_type_request.type,
+                title=title,
+                content=content
+            )
+        )
     
     # Verify we have at least one successful generation
     if not generated_content_list:
@@ -182,9 +267,9 @@ async def generate_all_content(
 
 def format_response(
     generated_content: List[GeneratedContent],
-    token_info: Dict[str, Any],
+    token_info: TokenInfo,
     text_used: str,
-    req_logger = logger
+    echo_text: bool = True
 ) -> ContentGenerateResponse:
     """
     Format the response for the content generation endpoint
@@ -193,7 +278,7 @@ def format_response(
         generated_content: List of generated content items
         token_info: Token information
         text_used: The text used for generation
-        req_logger: Logger to use for this request
+        echo_text: Whether to include the full text used in the response
         
     Returns:
         Formatted response
@@ -202,8 +287,8 @@ def format_response(
         ContentGenerateRouterError: If response formatting fails
     """
     try:
-        # Format response
-        response = ContentGenerateResponse(
+        # Format response; the data is built internally, so skip revalidation
+        response = ContentGenerateResponse.model_construct(
             generated_content=generated_content,
             model=token_info.get("model", "unknown"),
             model_family=token_info.get("model_family", "unknown"),
@@ -212,20 +297,138 @@ def format_response(
             token_limit=token_info.get("model_limit", 0),
             token_count=token_info.get("token_count", 0),
             remaining_tokens=token_info.get("tokens_remaining", 0),
-            text_used=text_used
+            text_used=text_used if echo_text else None,
+            text_used_sha256=hashlib.sha256(text_used.encode("utf-8")).hexdigest()
         )
         
-        req_logger.debug("Response formatted successfully")
+        request_logger.get().debug("Response formatted successfully")
         return response
     except Exception as e:
-        req_logger.error(f"Error formatting response: {str(e)}")
+        request_logger.get().error("Error formatting response: %s", e)
         raise ContentGenerateRouterError(f"Error formatting response: {str(e)}")
 
+async def stream_content_for_type(
+    content_type: str,
+    title: str,
+    intent: str,
+    text: str,
+    events: asyncio.Queue
+) -> None:
+    """
+    Stream content for a specific content type into a shared event queue
+    
+    Deltas are buffered and flushed every STREAM_FLUSH_INTERVAL_SECONDS or
+    STREAM_FLUSH_SIZE characters, whichever comes first. The last event put
+    on the queue for the content type has either "done" or "error" set.
+    
+    Args:
+        content_type: Content type to generate
+        title: Optional title for the content
+        intent: Customer intent statement
+        text: Source text
+        events: Queue receiving the stream events for this content type
+    """
+    req_logger = request_logger.get()
+    try:
+        # Previously generated content is sent as a single delta
+        cache_key = content_generate_service.get_cache_key(content_type, intent, text, title)
+        cached_content = content_generate_service.get_cached_or_none(cache_key)
+        if cached_content is not None:
+            req_logger.info("Using cached content for type: %s", content_type)
+            await events.put({"type": content_type, "delta": cached_content})
+            await events.put({"type": content_type, "done": True})
+            return
+        
+        # Format the prompt
+        req_logger.info("Streaming content for type: %s", content_type)
+        prompt = content_generate_service.format_content_generate_prompt(
+            content_type=content_type,
+            intent=intent,
+            text=text,
+            title=title
+        )
+        
+        content_parts = []
+        buffer = []
+        buffer_size = 0
+        last_flush = time.monotonic()
+        
+        async with llm_semaphore:
+            async for delta in ai_service.generate_completion_stream(messages=prompt["messages"]):
+                content_parts.append(delta)
+                buffer.append(delta)
+                buffer_size += len(delta)
+                
+                # Flush when enough text has accumulated or enough time has passed
+                now = time.monotonic()
+                if buffer_size >= STREAM_FLUSH_SIZE or now - last_flush >= STREAM_FLUSH_INTERVAL_SECONDS:
+                    await events.put({"type": content_type, "delta": "".join(buffer)})
+                    buffer = []
+                    buffer_size = 0
+                    last_flush = now
+        
+        if buffer:
+            await events.put({"type": content_type, "delta": "".join(buffer)})
+        
+        generated_content = "".join(content_parts)
+        if not generated_content:
+            raise ContentGenerateRouterError("Empty response from LLM")
+        
+        req_logger.info("Streamed %d characters of content", len(generated_content))
+        content_generate_service.cache_content(cache_key, generated_content)
+        await events.put({"type": content_type, "done": True})
+        
+    except Exception as e:
+        req_logger.error("Error streaming content for type %s: %s", content_type, e)
+        await events.put({"type": content_type, "error": str(e)})
+
+async def stream_all_content(
+    request: ContentGenerateRequest
+) -> AsyncIterator[str]:
+    """
+    Stream content for all requested content types as JSON lines
+    
+    The content types are generated concurrently and their events are
+    interleaved in the order they are produced.
+    
+    Args:
+        request: The content generation request
+        
+    Yields:
+        JSON encoded stream events, one per line
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    tasks = [
+        asyncio.create_task(
+            stream_content_for_type(
+                content_type=content_type_request.type,
+                title=content_type_request.title,
+                intent=request.intent,
+                text=request.text_used,
+                events=events
+            )
+        )
+        for content_type_request in request.content_types
+    ]
+    
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event = await events.get()
+            if "done" in event or "error" in event:
+                remaining -= 1
+            yield json.dumps(event) + "\n"
+    finally:
+        # Stop any generation still running, e.g. when the client disconnects
+        for task in tasks:
+            task.cancel()
+
 @router.post("", response_model=ContentGenerateResponse)
 async def generate_content_endpoint(
     request: Request,
-    content_request: ContentGenerateRequest
-) -> ContentGenerateResponse:
+    content_request: ContentGenerateRequest,
+    echo: bool = Query(False, description="Include the full text used in the response")
+) -> Response:
     """
     Generate content based on customer intent, source text, and selected content types.
     
@@ -236,24 +439,26 @@ async def generate_content_endpoint(
     - **intent**: The customer intent statement (As a [user], I want to [action] because [reason])
     - **text_used**: The source text to use as the basis for content
     - **content_types**: List of content types to generate, with optional titles
+    - **echo**: Query parameter; set to include the full text used in the response
     
-    Returns content for each requested type, along with metadata.
+    Returns content for each requested type, along with metadata. The text used is
+    identified by its SHA-256 digest rather than echoed back unless requested.
     """
     # Get request-specific logger or use module logger as fallback
     req_logger = getattr(request.state, "logger", logger)
+    request_logger.set(req_logger)
     
     try:
         # Log request start
         req_logger.info("Processing content generation request")
         
-        # 1. Validate token count
-        token_info = validate_token_count(content_request.text_used, req_logger)
+        # 1. Validate token count in a worker thread to keep the event loop free
+        token_info = await asyncio.to_thread(validate_token_count, content_request.text_used)
         
         # 2. Generate content for all requested types
         generated_content = await generate_all_content(
             request=content_request,
-            token_info=token_info,
-            req_logger=req_logger
+            token_info=token_info
         )
         
         # 3. Format and return response
@@ -261,31 +466,73 @@ async def generate_content_endpoint(
             generated_content=generated_content,
             token_info=token_info,
             text_used=content_request.text_used,
-            req_logger=req_logger
+            echo_text=echo
         )
         
         req_logger.info("Content generation completed successfully")
-        return response
+        
+        # Encode with the model's compiled serializer and return the bytes directly,
+        # so FastAPI does not revalidate the response against the response model
+        return Response(content=response.model_dump_json(), media_type="application/json")
         
     except ContentGenerateRouterError as e:
         # Handle router-specific errors
-        req_logger.error(f"Content generation router error: {str(e)}")
+        req_logger.error("Content generation router error: %s", e)
         raise HTTPException(
             status_code=400,
             detail=str(e)
         )
     except OpenAIServiceError as e:
         # Handle OpenAI service errors
-        req_logger.error(f"OpenAI service error: {str(e)}")
+        req_logger.error("OpenAI service error: %s", e)
         raise HTTPException(
             status_code=503,
             detail=f"Error calling AI service: {str(e)}"
         )
     except Exception as e:
         # Handle unexpected errors
-        req_logger.error(f"Unexpected error in content generation: {str(e)}")
-        req_logger.error(f"Traceback: {traceback.format_exc()}")
+        req_logger.error("Unexpected error in content generation: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while generating content"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/stream")
+async def generate_content_stream_endpoint(
+    request: Request,
+    content_request: ContentGenerateRequest
+) -> StreamingResponse:
+    """
+    Stream generated content based on customer intent, source text, and selected content types.
+    
+    All requested content types are generated concurrently. The response is
+    newline-delimited JSON where each line is one of:
+    - **{"type": ..., "delta": ...}**: A piece of generated markdown for a content type
+    - **{"type": ..., "done": true}**: Generation for the content type finished
+    - **{"type": ..., "error": ...}**: Generation for the content type failed
+    
+    Parameters are the same as for the non-streaming endpoint.
+    """
+    # Get request-specific logger or use module logger as fallback
+    req_logger = getattr(request.state, "logger", logger)
+    request_logger.set(req_logger)
+    
+    try:
+        # Log request start
+        req_logger.info("Processing streaming content generation request")
+        
+        # Validate token count before the response starts
+        await asyncio.to_thread(validate_token_count, content_request.text_used)
+        
+    except ContentGenerateRouterError as e:
+        # Handle router-specific errors
+        req_logger.error("Content generation router error: %s", e)
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        stream_all_content(content_request),
+        media_type="application/x-ndjson"
+    )
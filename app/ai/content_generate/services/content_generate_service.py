@@ -1,43 +1,25 @@
-from typing import Dict, Any, List
+import sys
+from typing import Dict, Any, List, Optional, Tuple
 from app.ai.content_types.models.content_types_config import CONTENT_TYPES
+from app.shared.cache import LRUCache, content_key
 
-class ContentGenerateService:
-    """Service for content generation operations"""
+def _render_system_prompt(content_type: str, type_info: Dict[str, str]) -> str:
+    """
+    Render the system prompt for a content type
     
-    def format_content_generate_prompt(self, 
-                                      content_type: str, 
-                                      intent: str, 
-                                      text: str,
-                                      title: str = None) -> Dict[str, Any]:
-        """
-        Format the prompt for content generation for a specific content type
-        
-        Args:
-            content_type: The content type to generate (tutorial, how-to, explanation, reference)
-            intent: The customer intent statement
-            text: The source text to use
-            title: Optional title for the content
-            
-        Returns:
-            Formatted prompt for the LLM
-        """
-        # Input validation
-        if content_type not in CONTENT_TYPES:
-            raise ValueError(f"Invalid content type: {content_type}")
-        if not intent or not intent.strip():
-            raise ValueError("Intent cannot be empty")
-        if not text or not text.strip():
-            raise ValueError("Text cannot be empty")
+    Args:
+        content_type: The content type key (tutorial, how-to, explanation, reference)
+        type_info: The content type details from CONTENT_TYPES
         
-        # Get content type details
-        type_info = CONTENT_TYPES[content_type]
-        type_name = type_info["name"]
-        type_description = type_info["description"]
-        type_purpose = type_info["purpose"]
-        type_template = type_info["markdown_template"]
-        
-        # Create a system prompt that explains the task
-        system_prompt = f"""
+    Returns:
+        System prompt for the LLM
+    """
+    type_name = type_info["name"]
+    type_description = type_info["description"]
+    type_purpose = type_info["purpose"]
+    type_template = type_info["markdown_template"]
+    
+    return f"""
         You are an AI content creation assistant specialized in creating {type_name} content.
         
         About this content type:
@@ -67,19 +49,110 @@ class ContentGenerateService:
         
         Return only the final markdown content with no additional text.
         """
+
+# Pre-rendered (system prompt, content type name) per content type; the system
+# prompt depends only on the content type, so it is rendered once at import
+_TYPE_PACK: Dict[str, Tuple[str, str]] = {
+    content_type: (sys.intern(_render_system_prompt(content_type, type_info)), type_info["name"])
+    for content_type, type_info in CONTENT_TYPES.items()
+}
+
+class ContentGenerateService:
+    """Service for content generation operations"""
+    
+    def __init__(self, cache_size: int = 2048, cache_ttl: float = 3600):
+        """
+        Initialize the service
         
-        # Create a user prompt with the intent, text and title
-        title_text = f"Title: {title}" if title else "Please create an appropriate title"
-        user_prompt = f"""
-        Customer Intent: {intent}
+        Args:
+            cache_size: Maximum number of generated content items to cache
+            cache_ttl: Number of seconds a generated content item stays cached
+        """
+        # Generated content keyed on the inputs that produced it
+        self._content_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+    
+    @staticmethod
+    def get_cache_key(content_type: str, intent: str, text: str, title: Optional[str] = None) -> str:
+        """
+        Build the cache key for a content generation request
+        
+        Args:
+            content_type: The content type to generate
+            intent: The customer intent statement
+            text: The source text to use
+            title: Optional title for the content
+            
+        Returns:
+            Cache key identifying the generation inputs
+        """
+        return content_key(content_type, intent, text, title or "")
+    
+    def get_cached_or_none(self, key: str) -> Optional[str]:
+        """
+        Get previously generated content for a cache key
         
-        {title_text}
+        Args:
+            key: Cache key from get_cache_key
+            
+        Returns:
+            Cached markdown content, or None if not cached
+        """
+        return self._content_cache.get(key)
+    
+    def cache_content(self, key: str, content: str) -> None:
+        """
+        Cache generated content for a cache key
         
-        Source Text:
-        {text}
+        Args:
+            key: Cache key from get_cache_key
+            content: Generated markdown content
+        """
+        self._content_cache.set(key, content)
+    
+    def clear_cache(self) -> None:
+        """Remove all cached generated content"""
+        self._content_cache.clear()
+    
+    @staticmethod
+    def format_content_generate_prompt(content_type: str, 
+                                       intent: str, 
+                                       text: str,
+                                       title: str = None) -> Dict[str, Any]:
+        """
+        Format the prompt for content generation for a specific content type
         
-        Please generate {type_name} content following the template structure.
+        Args:
+            content_type: The content type to generate (tutorial, how-to, explanation, reference)
+            intent: The customer intent statement
+            text: The source text to use
+            title: Optional title for the content
+            
+        Returns:
+            Formatted prompt for the LLM
         """
+        # Input validation
+        type_pack = _TYPE_PACK.get(content_type)
+        if type_pack is None:
+            raise ValueError(f"Invalid content type: {content_type}")
+        if not intent or intent.isspace():
+            raise ValueError("Intent cannot be empty")
+        if not text or text.isspace():
+            raise ValueError("Text cannot be empty")
+        
+        # Get the pre-rendered system prompt and content type name
+        system_prompt, type_name = type_pack
+        
+        # Create a user prompt with the intent, text and title
+        # (joined from parts so the potentially large source text is copied only
+        # once; the line breaks and indentation match the original prompt text)
+        title_text = f"Title: {title}" if title else "Please create an appropriate title"
+        user_prompt = "".join([
+            "\n        Customer Intent: ", intent,
+            "\n        \n        ", title_text,
+            "\n        \n        Source Text:\n        ", text,
+            "\n        \n        Please generate ", type_name,
+            " content following the template structure.\n        "
+        ])
         
         # Return the formatted messages
         return {
@@ -87,4 +160,4 @@ class ContentGenerateService:
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ]
-        } 
\ No newline at end of file
+        } 
@@ -1,19 +1,45 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Any
 
 class ContentTypeSelection(BaseModel):
     """Model for a selected content type"""
+    # Selections are shared through the selection cache, so they are immutable
+    model_config = ConfigDict(frozen=True)
+    
     type: str = Field(..., description="The content type (tutorial, how-to, explanation, reference)")
     confidence: float = Field(..., description="Confidence score for this selection")
     reasoning: str = Field(..., description="Reasoning for this selection")
 
+class ContentTypeReplySelection(ContentTypeSelection):
+    """Content type selection as returned by the LLM, with defaults for missing fields"""
+    type: str = Field("", description="The content type (tutorial, how-to, explanation, reference)")
+    confidence: float = Field(0, description="Confidence score for this selection")
+    reasoning: str = Field("", description="Reasoning for this selection")
+
+class ContentTypeReply(BaseModel):
+    """Model for the JSON reply to the content type selection prompt"""
+    content_types: List[ContentTypeReplySelection] = Field(..., description="Content types selected by the LLM")
+
+class ContentTypeBatchResult(ContentTypeReply):
+    """Model for the selection of one request in a batched reply"""
+    id: int = Field(..., description="Position of the request in the batch")
+
+class ContentTypeBatchReply(BaseModel):
+    """Model for the JSON reply to a batched content type selection prompt"""
+    results: List[ContentTypeBatchResult] = Field(..., description="Selections for each request in the batch")
+
 class ContentTypeRequest(BaseModel):
     """Request model for content type selection"""
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True, frozen=True)
+    
     intent: str = Field(..., description="The customer intent statement")
     text_used: str = Field(..., description="The source text to analyze")
 
 class ContentTypeResponse(BaseModel):
     """Response model for content type selection"""
+    # Responses are immutable, like the cached selections they are built from
+    model_config = ConfigDict(frozen=True)
+    
     selected_types: List[ContentTypeSelection] = Field(..., description="List of selected content types")
     model: str = Field(..., description="Model used for generation")
     model_family: str = Field(..., description="Family of the model used")
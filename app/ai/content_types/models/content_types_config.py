@@ -1,3 +1,5 @@
+import sys
+
 # Define content types based on the Diátaxis framework
 CONTENT_TYPES = {
     "tutorial": {
@@ -139,4 +141,9 @@ Important notes or considerations.
 Links to related reference documentation.
 """
     }
-} 
\ No newline at end of file
+}
+
+# Templates are static: strip the surrounding blank lines and intern them once at import
+for _type_info in CONTENT_TYPES.values():
+    _type_info["markdown_template"] = sys.intern(_type_info["markdown_template"].strip())
+del _type_info
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.ai.content_types.models.content_type_model import ContentTypeRequest, ContentTypeResponse, ContentTypeSelection
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import StreamingResponse
+from app.ai.content_types.models.content_type_model import ContentTypeBatchReply, ContentTypeReply, ContentTypeReplySelection, ContentTypeRequest, ContentTypeResponse, ContentTypeSelection
 from app.ai.content_types.models.content_types_config import CONTENT_TYPES
-from app.ai.content_types.services.content_type_service import ContentTypeService
-from app.ai.core.services.ai_core_service import AIService
-from app.ai.core.services.tokenizer_core_service import TokenizerService, TokenizerError
-from app.config.settings import OpenAISettings
+from app.ai.content_types.services.content_type_service import ContentTypeService, ContentTypeStreamParser
+from app.ai.core.services.ai_core_service import AIService, OpenAIServiceError, get_shared_ai_service
+from app.ai.core.services.tokenizer_core_service import TokenInfo, TokenizerService, TokenizerError
+from app.config.settings import get_settings
 from app.shared.logging import get_logger
+from app.shared.cache import MicroBatcher, SingleFlight
+import asyncio
 import json
-import traceback
-from typing import Dict, Any, List
+from pydantic import ValidationError
+from typing import Dict, Any, List, AsyncIterator, Sequence, Tuple
 
 # Set up module logger
 logger = get_logger("content_type_router")
@@ -22,19 +25,22 @@ router = APIRouter(
 )
 
 # Initialize settings first
-openai_settings = OpenAISettings()
+openai_settings = get_settings()
 
 # Create service instances with dependencies
 tokenizer_service = TokenizerService(openai_settings)
-ai_service = AIService(openai_settings)
+ai_service = get_shared_ai_service(openai_settings)
 content_type_service = ContentTypeService()
 
+# Identical selections already in flight, shared by concurrent callers
+inflight_selections = SingleFlight()
+
 # Custom exception for router-specific errors
 class ContentTypeRouterError(Exception):
     """Custom exception for content type router errors"""
     pass
 
-def validate_token_count(text: str, req_logger = logger) -> Dict[str, Any]:
+def validate_token_count(text: str, req_logger = logger) -> TokenInfo:
     """
     Validate text against token limits
     
@@ -50,105 +56,295 @@ def validate_token_count(text: str, req_logger = logger) -> Dict[str, Any]:
     """
     try:
         # Log input details
-        req_logger.debug(f"Validating tokens for text length: {len(text)}")
+        req_logger.debug("Validating tokens for text length: %d", len(text))
         
         # Log model configuration
-        req_logger.debug(f"Current model: {openai_settings.default_model}")
-        req_logger.debug(f"Model encoding: {openai_settings.encoding}")
+        req_logger.debug("Current model: %s", openai_settings.default_model)
+        req_logger.debug("Model encoding: %s", openai_settings.encoding)
         
         # Validate tokens using tokenizer service
         req_logger.debug("Calling tokenizer service validate_tokens")
         token_info = tokenizer_service.validate_tokens(text)
         
         # Log token counts and model info
-        req_logger.info(f"Token count: {token_info['token_count']}/{token_info['model_limit']} ({token_info['percentage_used']}%)")
-        req_logger.info(f"Using model: {token_info['model']} ({token_info['model_family']})")
-        req_logger.debug(f"Model capabilities: {token_info['capabilities']}")
+        req_logger.info(
+            "Token count: %s/%s (%s%%)",
+            token_info['token_count'], token_info['model_limit'], token_info['percentage_used']
+        )
+        req_logger.info("Using model: %s (%s)", token_info['model'], token_info['model_family'])
+        req_logger.debug("Model capabilities: %s", token_info['capabilities'])
         
         # Return token information
         return token_info
         
     except TokenizerError as e:
-        req_logger.error(f"Tokenizer error: {str(e)}")
-        req_logger.error(f"Error type: {type(e)}")
-        req_logger.error(f"Error traceback: {traceback.format_exc()}")
+        req_logger.exception("Tokenizer error: %s", e)
         raise ContentTypeRouterError(f"Tokenizer error: {str(e)}")
     except Exception as e:
-        req_logger.error(f"Unexpected error in token validation: {str(e)}")
-        req_logger.error(f"Error type: {type(e)}")
-        req_logger.error(f"Error traceback: {traceback.format_exc()}")
+        req_logger.exception("Unexpected error in token validation: %s", e)
         if isinstance(e, ContentTypeRouterError):
             raise
         raise ContentTypeRouterError(f"Error validating token count: {str(e)}")
 
+async def _complete_selection(
+    intent: str,
+    text_used: str,
+    ai_service: AIService,
+    logger: Any
+) -> Tuple[ContentTypeReply, Dict[str, Any]]:
+    """
+    Call the LLM to select content types for one request
+    
+    Args:
+        intent: The customer intent statement
+        text_used: The source text to analyze
+        ai_service: AI service used for the completion
+        logger: Logger to use for this request
+        
+    Returns:
+        The decoded reply and the completion it came from
+        
+    Raises:
+        ContentTypeRouterError: If the LLM response is empty or invalid
+        OpenAIServiceError: If the AI service call fails
+    """
+    # Format the prompt
+    prompt = content_type_service.format_content_type_prompt(intent, text_used)
+    
+    # Generate completion - use same format as customer intent router
+    completion = await ai_service.generate_completion(messages=prompt["messages"], user=prompt["user"])
+    
+    # Log the response
+    logger.info("Response usage: %s", completion.get('usage', {}))
+    
+    # Extract the content from the response - handle the format returned by AIService
+    content = completion.get('text', '')
+    
+    if not content:
+        raise ContentTypeRouterError("Empty response from LLM")
+        
+    # Parse and validate the response in one pass; the reply is decoded
+    # straight into the selection models without an intermediate dict
+    try:
+        reply = ContentTypeReply.model_validate_json(content)
+    except ValidationError as e:
+        logger.error("Error parsing LLM response: %s", e)
+        logger.error("Raw response: %s", content)
+        raise ContentTypeRouterError(f"Error parsing LLM response: {str(e)}")
+    
+    return reply, completion
+
+async def _complete_selection_batch(requests: List[Tuple[str, str]]) -> List[Any]:
+    """
+    Call the LLM once to select content types for a batch of requests
+    
+    A single request is sent with the regular prompt. Requests missing
+    from a batched reply, or every request if the reply cannot be decoded,
+    are retried one at a time.
+    
+    Args:
+        requests: (intent, text) pairs collected by the batcher
+        
+    Returns:
+        For each request, the decoded reply and the completion it came from,
+        or the exception raised while selecting for it
+    """
+    if len(requests) == 1:
+        intent, text_used = requests[0]
+        return [await _complete_selection(intent, text_used, ai_service, logger)]
+    
+    results: List[Any] = [None] * len(requests)
+    try:
+        prompt = content_type_service.format_batch_content_type_prompt(requests)
+        completion = await ai_service.generate_completion(messages=prompt["messages"], user=prompt["user"])
+        logger.info("Batched %d content type selections, usage: %s", len(requests), completion.get('usage', {}))
+        
+        batch_reply = ContentTypeBatchReply.model_validate_json(completion.get('text', '') or '{}')
+        for result in batch_reply.results:
+            if 0 <= result.id < len(requests):
+                results[result.id] = (ContentTypeReply(content_types=result.content_types), completion)
+    except (OpenAIServiceError, ValidationError) as e:
+        logger.warning("Batched content type selection failed, selecting individually: %s", e)
+    
+    # Select anything the batch did not answer on its own
+    missing = [index for index, result in enumerate(results) if result is None]
+    if missing:
+        retries = await asyncio.gather(
+            *(_complete_selection(*requests[index], ai_service, logger) for index in missing),
+            return_exceptions=True
+        )
+        for index, retry in zip(missing, retries):
+            results[index] = retry
+    
+    return results
+
+async def _select_uncached_content_types(
+    intent: str,
+    text_used: str,
+    ai_service: AIService,
+    cache_key: str,
+    logger: Any
+) -> Tuple[ContentTypeReply, Dict[str, Any]]:
+    """
+    Call the LLM to select content types and cache the selection
+    
+    Args:
+        intent: The customer intent statement
+        text_used: The source text to analyze
+        ai_service: AI service used for the completion
+        cache_key: Cache key for the selection inputs
+        logger: Logger to use for this request
+        
+    Returns:
+        The decoded reply and the completion it came from
+        
+    Raises:
+        ContentTypeRouterError: If the LLM response is empty or invalid
+        OpenAIServiceError: If the AI service call fails
+    """
+    if content_type_batcher is None:
+        reply, completion = await _complete_selection(intent, text_used, ai_service, logger)
+    else:
+        reply, completion = await content_type_batcher.submit((intent, text_used))
+    
+    content_type_service.cache_selection(cache_key, reply.content_types, completion.get('model', 'unknown'))
+    return reply, completion
+
+def _build_selection_response(
+    selected_types: Sequence[ContentTypeSelection],
+    model: str,
+    usage: Dict[str, int],
+    token_info: TokenInfo
+) -> ContentTypeResponse:
+    """
+    Build the response for a selection from the caller's own token information
+    
+    Args:
+        selected_types: The selected content types
+        model: Model that made the selection
+        usage: Token usage of the completion, empty when no call was made
+        token_info: Token information for the caller's source text
+        
+    Returns:
+        ContentTypeResponse with the selected content types
+    """
+    # Every field is validated or produced by us, so skip revalidation
+    return ContentTypeResponse.model_construct(
+        selected_types=list(selected_types),
+        model=model,
+        model_family=token_info.get("model_family", "unknown"),
+        capabilities=token_info.get("capabilities", {}),
+        usage=usage,
+        token_limit=token_info.get("model_limit", 0),
+        token_count=token_info.get("token_count", 0),
+        remaining_tokens=token_info.get("tokens_remaining", 0)
+    )
+
+# Selections arriving within the batch window share one LLM call; batching
+# adds up to the window to every uncached selection, so it is off by default
+content_type_batcher = (
+    MicroBatcher(
+        _complete_selection_batch,
+        max_wait=openai_settings.content_types_batch_window_ms / 1000,
+        max_batch_size=openai_settings.content_types_batch_size
+    )
+    if openai_settings.content_types_batch_window_ms > 0
+    else None
+)
+
 async def select_content_types(
     intent: str,
     text_used: str,
     ai_service: AIService,
     token_service: TokenizerService,
-    token_info: Dict[str, Any],
+    token_info: TokenInfo,
     logger: Any
 ) -> ContentTypeResponse:
     """Select content types based on customer intent and source text."""
     try:
-        # Format the prompt
+        # Reuse the previous selection for the same intent and text; no
+        # completion was made for this request, so it reports no usage
+        cache_key = content_type_service.get_cache_key(intent, text_used)
+        cached = content_type_service.get_cached_or_none(cache_key)
+        if cached is not None:
+            logger.info("Using cached content type selection")
+            selected_types, model = cached
+            return _build_selection_response(selected_types, model, {}, token_info)
+        
+        # Join an identical selection that is already running, or start one;
+        # the key is normalized, so each caller adds its own token information
+        reply, completion = await inflight_selections.do(
+            cache_key,
+            lambda: _select_uncached_content_types(intent, text_used, ai_service, cache_key, logger)
+        )
+        return _build_selection_response(
+            reply.content_types,
+            completion.get('model', 'unknown'),
+            completion.get('usage', {}),
+            token_info
+        )
+            
+    except Exception as e:
+        logger.error("Error selecting content types: %s", e)
+        raise ContentTypeRouterError(f"Error selecting content types: {str(e)}")
+
+def _selection_event(content_type: Dict[str, Any]) -> str:
+    """
+    Encode one content type selection as a stream line
+    
+    Args:
+        content_type: Content type entry from the LLM reply
+        
+    Returns:
+        JSON encoded selection followed by a newline
+    """
+    selection = ContentTypeReplySelection.model_validate(content_type)
+    return selection.model_dump_json() + "\n"
+
+async def stream_content_types(intent: str, text_used: str) -> AsyncIterator[str]:
+    """
+    Stream content type selections as JSON lines while the LLM reply arrives
+    
+    Each selection is sent as soon as its entry in the reply is complete.
+    The last line has either "done" or "error" set.
+    
+    Args:
+        intent: The customer intent statement
+        text_used: The source text to analyze
+        
+    Yields:
+        JSON encoded stream events, one per line
+    """
+    try:
+        # Previous selections for the same intent and text are sent at once
+        cached = content_type_service.get_cached_or_none(
+            content_type_service.get_cache_key(intent, text_used)
+        )
+        if cached is not None:
+            logger.info("Using cached content type selection")
+            selected_types, _ = cached
+            for selection in selected_types:
+                yield selection.model_dump_json() + "\n"
+            yield json.dumps({"done": True}) + "\n"
+            return
+        
         prompt = content_type_service.format_content_type_prompt(intent, text_used)
+        parser = ContentTypeStreamParser()
         
-        # Generate completion - use same format as customer intent router
-        completion = await ai_service.generate_completion(messages=prompt["messages"])
+        async for delta in ai_service.generate_completion_stream(messages=prompt["messages"], user=prompt["user"]):
+            for content_type in parser.feed(delta):
+                yield _selection_event(content_type)
         
-        # Log the response
-        logger.info(f"Response usage: {completion.get('usage', {})}")
+        if not parser.finished:
+            raise ContentTypeRouterError("Invalid response format: incomplete 'content_types' list")
         
-        # Extract the content from the response - handle the format returned by AIService
-        content = completion.get('text', '')
+        yield json.dumps({"done": True}) + "\n"
         
-        if not content:
-            raise ContentTypeRouterError("Empty response from LLM")
-            
-        # Parse the response
-        try:
-            # The response should be a JSON string
-            content_data = json.loads(content)
-            
-            # Validate the response structure
-            if not isinstance(content_data, dict):
-                raise ContentTypeRouterError("Invalid response format: expected a dictionary")
-                
-            if 'content_types' not in content_data:
-                raise ContentTypeRouterError("Invalid response format: missing 'content_types' key")
-                
-            # Transform content_types to selected_types format
-            selected_types = []
-            for content_type in content_data['content_types']:
-                selected_types.append(ContentTypeSelection(
-                    type=content_type.get('type', ''),
-                    confidence=content_type.get('confidence', 0),
-                    reasoning=content_type.get('reasoning', '')
-                ))
-                
-            # Create the response
-            return ContentTypeResponse(
-                selected_types=selected_types,
-                model=completion.get('model', 'unknown'),
-                model_family=token_info.get("model_family", "unknown"),
-                capabilities=token_info.get("capabilities", {}),
-                usage=completion.get('usage', {}),
-                token_limit=token_info.get("model_limit", 0),
-                token_count=token_info.get("token_count", 0),
-                remaining_tokens=token_info.get("tokens_remaining", 0),
-                text_used=text_used
-            )
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing LLM response: {str(e)}")
-            logger.error(f"Raw response: {content}")
-            raise ContentTypeRouterError(f"Error parsing LLM response: {str(e)}")
-            
     except Exception as e:
-        logger.error(f"Error selecting content types: {str(e)}")
-        raise ContentTypeRouterError(f"Error selecting content types: {str(e)}")
+        logger.error("Error streaming content types: %s", e)
+        yield json.dumps({"error": str(e)}) + "\n"
 
-def format_response(selected_types: List[ContentTypeSelection], token_info: Dict[str, Any], req_logger = logger) -> ContentTypeResponse:
+def format_response(selected_types: List[ContentTypeSelection], token_info: TokenInfo, req_logger = logger) -> ContentTypeResponse:
     """
     Format the response for the content types endpoint
     
@@ -164,8 +360,8 @@ def format_response(selected_types: List[ContentTypeSelection], token_info: Dict
         ContentTypeRouterError: If response formatting fails
     """
     try:
-        # Format response
-        response = ContentTypeResponse(
+        # Format response; the data is built internally, so skip revalidation
+        response = ContentTypeResponse.model_construct(
             selected_types=selected_types,
             model=token_info.get("model", "unknown"),
             model_family=token_info.get("model_family", "unknown"),
@@ -176,18 +372,16 @@ def format_response(selected_types: List[ContentTypeSelection], token_info: Dict
             remaining_tokens=token_info.get("tokens_remaining", 0)
         )
         
-        req_logger.debug(f"Response formatted: {response}")
+        req_logger.debug("Response formatted: %s", response)
         return response
     except Exception as e:
-        req_logger.error(f"Error formatting response: {str(e)}")
-        req_logger.error(f"Error type: {type(e)}")
-        req_logger.error(f"Error traceback: {traceback.format_exc()}")
+        req_logger.exception("Error formatting response: %s", e)
         raise ContentTypeRouterError(f"Error formatting response: {str(e)}")
 
 @router.post("", response_model=ContentTypeResponse)
 async def select_content_types_endpoint(
     request: ContentTypeRequest
-) -> ContentTypeResponse:
+) -> Response:
     """
     Select appropriate content types based on customer intent and source text.
     
@@ -205,8 +399,8 @@ async def select_content_types_endpoint(
         intent = request.intent
         text = request.text_used
         
-        # Validate token count
-        token_info = validate_token_count(text, logger)
+        # Validate token count in a worker thread so encoding long texts does not block the event loop
+        token_info = await asyncio.to_thread(validate_token_count, text, logger)
         
         # Select content types
         response = await select_content_types(
@@ -218,17 +412,53 @@ async def select_content_types_endpoint(
             logger=logger
         )
         
-        return response
+        # Return the encoded model directly so FastAPI does not revalidate it
+        return Response(content=response.model_dump_json(), media_type="application/json")
         
     except ContentTypeRouterError as e:
-        logger.error(f"Content type error: {str(e)}")
+        logger.error("Content type error: %s", e)
         raise HTTPException(
             status_code=400,
             detail=f"Error selecting content types: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.post("/stream")
+async def select_content_types_stream_endpoint(
+    request: ContentTypeRequest
+) -> StreamingResponse:
+    """
+    Stream content type selections based on customer intent and source text.
+    
+    The response is newline-delimited JSON. Each selection is sent as soon as
+    the model has produced it, followed by a final line of either
+    **{"done": true}** or **{"error": ...}**.
+    
+    Args:
+        request: The request containing intent and source text
+        
+    Returns:
+        StreamingResponse with one selected content type per line
+        
+    Raises:
+        HTTPException: If token validation fails
+    """
+    try:
+        # Validate token count before the response starts
+        await asyncio.to_thread(validate_token_count, request.text_used, logger)
+    except ContentTypeRouterError as e:
+        logger.error("Content type error: %s", e)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Error selecting content types: {str(e)}"
+        )
+    
+    return StreamingResponse(
+        stream_content_types(request.intent, request.text_used),
+        media_type="application/x-ndjson"
+    )
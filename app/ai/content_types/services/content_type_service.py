@@ -1,29 +1,26 @@
-from typing import Dict, Any
+import json
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from app.ai.content_types.models.content_type_model import ContentTypeSelection
 from app.ai.content_types.models.content_types_config import CONTENT_TYPES
+from app.shared.cache import LRUCache, content_key
 
-class ContentTypeService:
-    """Service for content type selection operations"""
+def _build_system_prompt() -> str:
+    """
+    Build the system prompt for content type selection
     
-    def format_content_type_prompt(self, intent: str, text: str) -> dict:
-        """
-        Format the prompt for content type selection
-        
-        Args:
-            intent: The customer intent statement
-            text: The source text to analyze
-            
-        Returns:
-            Formatted prompt for the LLM
-        """
-        # Generate content type descriptions by iterating through the CONTENT_TYPES dictionary
-        content_type_descriptions = ""
-        for type_key, type_info in CONTENT_TYPES.items():
-            content_type_descriptions += f"\n{type_info['name']} ({type_key}):\n"
-            content_type_descriptions += f"- Description: {type_info['description']}\n"
-            content_type_descriptions += f"- Purpose: {type_info['purpose']}\n"
-        
-        # Create a system prompt that explains the task
-        system_prompt = f"""
+    Returns:
+        System prompt describing the content types and the response format
+    """
+    # Generate content type descriptions from the CONTENT_TYPES dictionary in one join
+    content_type_descriptions = "".join(
+        f"\n{type_info['name']} ({type_key}):\n"
+        f"- Description: {type_info['description']}\n"
+        f"- Purpose: {type_info['purpose']}\n"
+        for type_key, type_info in CONTENT_TYPES.items()
+    )
+    
+    # Create a system prompt that explains the task
+    return f"""
         You are an AI assistant specialized in content type selection based on the Diátaxis framework.
         Your task is to analyze the customer intent and source text to determine the most appropriate content type(s).
         
@@ -51,21 +48,204 @@ class ContentTypeService:
             ]
         }}
         """
+
+# The system prompt depends only on CONTENT_TYPES, so it is built once at import
+_SYSTEM_PROMPT = _build_system_prompt()
+
+# Instructions sent before the variable content; kept static so the system prompt
+# and these instructions form a prompt prefix the API can cache between requests
+_USER_INSTRUCTIONS = (
+    "Based on the customer intent and source text that follow, determine the most "
+    "appropriate content type(s) from the Diátaxis framework."
+)
+
+# Instructions for several requests answered in one reply; the expected reply
+# wraps the single-request format so each result decodes the same way
+_BATCH_INSTRUCTIONS = (
+    "The JSON array that follows holds several separate requests, each with an id, "
+    "a customer intent and a source text. For each request independently, determine "
+    "the most appropriate content type(s) from the Diátaxis framework. Your response "
+    "must be valid JSON with one result per request in the following format: "
+    '{"results": [{"id": 0, "content_types": [...]}, ...]}'
+)
+
+# Stable identifier for requests sharing this prompt prefix, so they are routed together
+PROMPT_CACHE_USER = "content-types-" + content_key(_SYSTEM_PROMPT, _USER_INSTRUCTIONS)
+
+class ContentTypeStreamParser:
+    """
+    Incrementally extracts the entries of the "content_types" array from a
+    JSON reply that arrives in pieces
+    
+    Each entry is returned as soon as its closing brace has been received,
+    without waiting for the rest of the reply.
+    """
+    
+    _decoder = json.JSONDecoder()
+    
+    def __init__(self):
+        self._buffer = ""
+        # Position of the next unparsed entry, or None until the array starts
+        self._position: Optional[int] = None
+        self._finished = False
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the closing bracket of the array has been received"""
+        return self._finished
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Add a piece of the reply and return the entries it completed
         
-        # Create a user prompt with the intent and text
-        user_prompt = f"""
-        Customer Intent: {intent}
+        Args:
+            text: The next piece of the JSON reply
+            
+        Returns:
+            Entries of the content_types array completed by this piece
+        """
+        self._buffer += text
+        entries = []
+        
+        if self._position is None:
+            key_index = self._buffer.find('"content_types"')
+            if key_index == -1:
+                return entries
+            array_index = self._buffer.find("[", key_index)
+            if array_index == -1:
+                return entries
+            self._position = array_index + 1
         
-        Source Text:
-        {text}
+        while not self._finished:
+            # Skip whitespace and separators between entries
+            position = self._position
+            while position < len(self._buffer) and self._buffer[position] in " \t\r\n,":
+                position += 1
+            self._position = position
+            if position >= len(self._buffer):
+                break
+            if self._buffer[position] == "]":
+                self._finished = True
+                break
+            
+            # An entry can only be complete once a closing brace has arrived after it
+            if self._buffer.find("}", position) == -1:
+                break
+            try:
+                entry, end = self._decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                break
+            self._position = end
+            if isinstance(entry, dict):
+                entries.append(entry)
         
-        Based on the above customer intent and source text, determine the most appropriate content type(s) from the Diátaxis framework.
+        return entries
+
+class ContentTypeService:
+    """Service for content type selection operations"""
+    
+    def __init__(self, cache_size: int = 1024, cache_ttl: float = 3600):
+        """
+        Initialize the service
+        
+        Args:
+            cache_size: Maximum number of content type selections to cache
+            cache_ttl: Number of seconds a content type selection stays cached
         """
+        # Content type selections and the model that made them, keyed on the
+        # normalized intent and text; token figures depend on the exact text,
+        # so they are not cached with them
+        self._selection_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+    
+    @staticmethod
+    def get_cache_key(intent: str, text: str) -> str:
+        """
+        Build the cache key for a content type selection request
+        
+        Whitespace runs are collapsed and case is folded, so requests that
+        differ only in formatting share a cache entry.
+        
+        Args:
+            intent: The customer intent statement
+            text: The source text to analyze
+            
+        Returns:
+            Cache key identifying the selection inputs
+        """
+        return content_key(" ".join(intent.split()).casefold(), " ".join(text.split()).casefold())
+    
+    def get_cached_or_none(self, key: str) -> Optional[Tuple[Tuple[ContentTypeSelection, ...], str]]:
+        """
+        Get a previous content type selection for a cache key
+        
+        Args:
+            key: Cache key from get_cache_key
+            
+        Returns:
+            Cached selections and the model that made them, or None if not cached
+        """
+        return self._selection_cache.get(key)
+    
+    def cache_selection(self, key: str, selected_types: Sequence[ContentTypeSelection], model: str) -> None:
+        """
+        Cache a content type selection for a cache key
+        
+        Args:
+            key: Cache key from get_cache_key
+            selected_types: The selected content types
+            model: Model that made the selection
+        """
+        self._selection_cache.set(key, (tuple(selected_types), model))
+    
+    def clear_cache(self) -> None:
+        """Remove all cached content type selections"""
+        self._selection_cache.clear()
+    
+    def format_content_type_prompt(self, intent: str, text: str) -> dict:
+        """
+        Format the prompt for content type selection
+        
+        Args:
+            intent: The customer intent statement
+            text: The source text to analyze
+            
+        Returns:
+            Formatted prompt for the LLM
+        """
+        # Variable content goes last so everything before it is a shared prefix
+        user_content = f"Customer Intent: {intent.rstrip()}\n\nSource Text:\n{text.rstrip()}"
         
         # Return the formatted messages
         return {
             "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-        } 
\ No newline at end of file
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": _USER_INSTRUCTIONS},
+                {"role": "user", "content": user_content}
+            ],
+            "user": PROMPT_CACHE_USER
+        }
+    
+    def format_batch_content_type_prompt(self, requests: List[Tuple[str, str]]) -> dict:
+        """
+        Format one prompt selecting content types for several requests
+        
+        Args:
+            requests: (intent, text) pairs; each pair's position is its id in the reply
+            
+        Returns:
+            Formatted prompt for the LLM
+        """
+        batch = [
+            {"id": index, "customer_intent": intent.rstrip(), "source_text": text.rstrip()}
+            for index, (intent, text) in enumerate(requests)
+        ]
+        
+        # The system prompt stays first so batches share its cached prefix too
+        return {
+            "messages": [
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": _BATCH_INSTRUCTIONS},
+                {"role": "user", "content": json.dumps(batch, ensure_ascii=False)}
+            ],
+            "user": PROMPT_CACHE_USER
+        }
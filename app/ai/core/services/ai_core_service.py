@@ -1,8 +1,54 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable
+import asyncio
+import functools
+import logging
 import os
+import httpx
 import openai
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-import traceback
+from app.shared.logging import get_logger
+
+# Set up module logger
+logger = get_logger("ai_core_service")
+
+# Connection pool limits for the HTTP client shared by all completions of a service
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=60)
+
+# Number of times a failed connection attempt is retried by the transport
+HTTP_CONNECT_RETRIES = 2
+
+# Seconds to wait for a connection, so network problems fail fast
+HTTP_CONNECT_TIMEOUT = 5.0
+
+# Default seconds to wait on each read; a non-streamed completion sends
+# nothing until it is finished, so this bounds the longest generation
+DEFAULT_READ_TIMEOUT = 600.0
+
+# Default bound on concurrent API calls made through one service
+DEFAULT_MAX_CONCURRENCY = 32
+
+# Scope of the Azure AD tokens used for Azure OpenAI
+AZURE_COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+@functools.lru_cache(maxsize=1)
+def _get_azure_token_provider() -> Callable[[], str]:
+    """
+    Get the Azure AD token provider shared by every Azure OpenAI client
+    
+    The credential probes its sources and caches tokens, so it is built once
+    per process. Sources that never apply to this service are excluded so
+    the probe skips them.
+    
+    Returns:
+        Function returning a bearer token for Azure OpenAI
+    """
+    credential = DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True,
+        exclude_shared_token_cache_credential=True
+    )
+    logger.debug("Created DefaultAzureCredential")
+    return get_bearer_token_provider(credential, AZURE_COGNITIVE_SERVICES_SCOPE)
 
 class OpenAIServiceError(Exception):
     """Custom exception for OpenAI service errors"""
@@ -13,26 +59,58 @@ class AIService:
     Service for interacting with OpenAI APIs (both regular and Azure)
     """
     
-    def __init__(self, settings=None):
+    def __init__(self, settings=None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
         """
         Initialize the OpenAI service with settings
         
         Args:
             settings: Optional settings object with API configuration
+            max_concurrency: Maximum number of concurrent API calls
         """
         self.settings = settings
         
+        # Bounds concurrent API calls so bursts do not turn into rate limit errors
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # Per-operation timeouts shared by both client types
+        read_timeout = settings.openai_read_timeout if settings else DEFAULT_READ_TIMEOUT
+        self.timeout = httpx.Timeout(read_timeout, connect=HTTP_CONNECT_TIMEOUT)
+        
         # Determine mode based on settings
         self.use_azure = False
         if settings and settings.use_azure:
             self.use_azure = True
-            print(f"Using Azure OpenAI configuration")
+            logger.info("Using Azure OpenAI configuration")
         else:
-            print(f"Using standard OpenAI configuration")
+            logger.info("Using standard OpenAI configuration")
+        
+        # One pooled HTTP/2 client reused by every call so connections stay alive
+        # and concurrent calls are multiplexed over them
+        self.http_client = self._create_http_client()
         
         # Create the appropriate client
         self._setup_client()
     
+    @staticmethod
+    def _create_http_client() -> httpx.AsyncClient:
+        """Create the pooled HTTP/2 client the OpenAI client sends requests through"""
+        return httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(http2=True, limits=HTTP_POOL_LIMITS, retries=HTTP_CONNECT_RETRIES)
+        )
+    
+    def _ensure_open(self):
+        """
+        Recreate the HTTP and OpenAI clients if the service has been closed
+        
+        The service is shared for the life of the process, but aclose() runs at
+        the end of every application lifespan, so a later lifespan in the same
+        process reopens it here instead of calling through a closed client.
+        """
+        if self.http_client.is_closed:
+            logger.debug("Reopening closed HTTP client")
+            self.http_client = self._create_http_client()
+            self._setup_client()
+    
     def _setup_client(self):
         """Set up the appropriate OpenAI client based on configuration"""
         if self.use_azure:
@@ -46,12 +124,12 @@ class AIService:
         api_key = self.settings.api_key if self.settings else os.getenv("OPENAI_API_KEY")
         
         if not api_key:
-            print("Warning: No OpenAI API key provided, but continuing in case Azure mode is enabled")
+            logger.warning("No OpenAI API key provided, but continuing in case Azure mode is enabled")
         
         # Mask key for logging if present
-        if api_key:
+        if api_key and logger.isEnabledFor(logging.DEBUG):
             masked_key = api_key[:8] + "..." + api_key[-4:] if len(api_key) > 12 else "***"
-            print(f"Using OpenAI API key: {masked_key}")
+            logger.debug("Using OpenAI API key: %s", masked_key)
         
         # Get organization from settings or environment (optional)
         org = self.settings.organization if self.settings and self.settings.organization else os.getenv("OPENAI_ORGANIZATION")
@@ -59,9 +137,11 @@ class AIService:
         # Create the async client
         self.client = openai.AsyncOpenAI(
             api_key=api_key,
-            organization=org
+            organization=org,
+            timeout=self.timeout,
+            http_client=self.http_client
         )
-        print(f"Created AsyncOpenAI client: {type(self.client)}")
+        logger.debug("Created AsyncOpenAI client: %s", type(self.client))
     
     def _setup_azure_client(self):
         """Set up Azure OpenAI client with managed identity"""
@@ -70,21 +150,14 @@ class AIService:
             azure_endpoint = self.settings.azure_endpoint if self.settings else os.getenv("AZURE_OPENAI_ENDPOINT")
             
             if not azure_endpoint:
-                print("No Azure OpenAI endpoint provided!")
+                logger.error("No Azure OpenAI endpoint provided")
                 raise OpenAIServiceError("No Azure OpenAI endpoint provided")
                 
-            print(f"Using Azure OpenAI endpoint: {azure_endpoint}")
+            logger.debug("Using Azure OpenAI endpoint: %s", azure_endpoint)
             
-            # Create the credential
-            credential = DefaultAzureCredential()
-            print("Created DefaultAzureCredential")
-            
-            # Create a token provider function with the proper scope
-            token_provider = get_bearer_token_provider(
-                credential, 
-                "https://cognitiveservices.azure.com/.default"
-            )
-            print("Created token provider for Azure OpenAI")
+            # Reuse the process-wide token provider with the proper scope
+            token_provider = _get_azure_token_provider()
+            logger.debug("Using token provider for Azure OpenAI")
             
             # Get API version from settings or environment
             api_version = (
@@ -96,20 +169,92 @@ class AIService:
             self.client = openai.AsyncAzureOpenAI(
                 azure_endpoint=azure_endpoint,
                 api_version=api_version,
-                azure_ad_token_provider=token_provider
+                azure_ad_token_provider=token_provider,
+                timeout=self.timeout,
+                http_client=self.http_client
             )
-            print(f"Created AsyncAzureOpenAI client with managed identity")
+            logger.debug("Created AsyncAzureOpenAI client with managed identity")
             
         except Exception as e:
-            print(f"Error setting up Azure OpenAI client: {str(e)}")
-            print(f"Error traceback: {traceback.format_exc()}")
+            logger.error(
+                "Error setting up Azure OpenAI client: %s", e,
+                exc_info=logger.isEnabledFor(logging.DEBUG)
+            )
             raise OpenAIServiceError(f"Failed to initialize Azure OpenAI client: {str(e)}")
     
+    async def aclose(self):
+        """Close the pooled HTTP client and release its connections"""
+        await self.http_client.aclose()
+    
+    def _build_completion_params(self,
+                                 messages: List[Dict[str, str]],
+                                 model: Optional[str] = None,
+                                 max_tokens: Optional[int] = None,
+                                 temperature: Optional[float] = None,
+                                 user: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the chat completion parameters for OpenAI or Azure OpenAI
+        
+        Args:
+            messages: List of message dictionaries with role and content
+            model: Optional model to use (ignored for Azure, which uses deployments)
+            max_tokens: Optional max tokens parameter
+            temperature: Optional temperature parameter
+            user: Optional stable identifier sent as the user field
+            
+        Returns:
+            Dictionary of parameters for chat.completions.create()
+            
+        Raises:
+            OpenAIServiceError: If the Azure deployment name is missing
+        """
+        # Build base parameters that work for both APIs
+        params = {
+            "messages": messages
+        }
+        
+        # Handle model parameter differently for Azure vs. regular OpenAI
+        if self.use_azure:
+            # For Azure, use deployment name as the model parameter
+            deployment = (
+                self.settings.azure_deployment_name if self.settings 
+                else os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+            )
+            if not deployment:
+                raise OpenAIServiceError("Azure OpenAI deployment name not provided")
+                
+            logger.debug("Using Azure deployment as model: %s", deployment)
+            params["model"] = deployment  # Pass deployment name to the model parameter
+        else:
+            # For regular OpenAI, use the model parameter as before
+            selected_model = model or (self.settings.default_model if self.settings else "gpt-4")
+            logger.debug("Using model: %s", selected_model)
+            params["model"] = selected_model
+        
+        # Add optional parameters if provided
+        if temperature is not None:
+            params["temperature"] = temperature
+            
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        
+        if user is not None:
+            params["user"] = user
+        
+        # Log the API call (without messages for brevity)
+        if logger.isEnabledFor(logging.DEBUG):
+            param_log = params.copy()
+            param_log["messages"] = f"[{len(messages)} messages]"
+            logger.debug("API parameters: %s", param_log)
+        
+        return params
+    
     async def generate_completion(self, 
                            messages: List[Dict[str, str]],
                            model: Optional[str] = None,
                            max_tokens: Optional[int] = None,
-                           temperature: Optional[float] = None) -> Dict[str, Any]:
+                           temperature: Optional[float] = None,
+                           user: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate a completion from OpenAI or Azure OpenAI
         
@@ -118,6 +263,7 @@ class AIService:
             model: Optional model to use (ignored for Azure, which uses deployments)
             max_tokens: Optional max tokens parameter
             temperature: Optional temperature parameter
+            user: Optional stable identifier sent as the user field
             
         Returns:
             Dictionary containing generated text and usage statistics
@@ -128,46 +274,15 @@ class AIService:
         try:
             # Log which service we're using
             service_name = "Azure OpenAI" if self.use_azure else "OpenAI"
-            print(f"Generating completion using {service_name}")
+            logger.debug("Generating completion using %s", service_name)
             
-            # Build base parameters that work for both APIs
-            params = {
-                "messages": messages
-            }
-            
-            # Handle model parameter differently for Azure vs. regular OpenAI
-            if self.use_azure:
-                # For Azure, use deployment name as the model parameter
-                deployment = (
-                    self.settings.azure_deployment_name if self.settings 
-                    else os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
-                )
-                if not deployment:
-                    raise OpenAIServiceError("Azure OpenAI deployment name not provided")
-                    
-                print(f"Using Azure deployment as model: {deployment}")
-                params["model"] = deployment  # Pass deployment name to the model parameter
-            else:
-                # For regular OpenAI, use the model parameter as before
-                selected_model = model or (self.settings.default_model if self.settings else "gpt-4")
-                print(f"Using model: {selected_model}")
-                params["model"] = selected_model
-            
-            # Add optional parameters if provided
-            if temperature is not None:
-                params["temperature"] = temperature
-                
-            if max_tokens is not None:
-                params["max_tokens"] = max_tokens
-            
-            # Log the API call (without messages for brevity)
-            param_log = params.copy()
-            param_log["messages"] = f"[{len(messages)} messages]"
-            print(f"API parameters: {param_log}")
+            params = self._build_completion_params(messages, model, max_tokens, temperature, user)
+            self._ensure_open()
             
             # Call the OpenAI API - same method signature for both clients
-            response = await self.client.chat.completions.create(**params)
-            print("Successfully called chat.completions.create()")
+            async with self._semaphore:
+                response = await self.client.chat.completions.create(**params)
+            logger.debug("Successfully called chat.completions.create()")
             
             # Build the result - same structure for both APIs
             result = {
@@ -180,11 +295,81 @@ class AIService:
                 }
             }
             
-            print(f"Response usage: {result['usage']}")
+            logger.debug("Response usage: %s", result["usage"])
             return result
             
         except Exception as e:
-            print(f"Error type: {type(e)}")
-            print(f"Error message: {str(e)}")
-            print(f"Error traceback: {traceback.format_exc()}")
-            raise OpenAIServiceError(f"Error calling {service_name} API: {str(e)}") 
\ No newline at end of file
+            logger.error(
+                "Error calling %s API (%s): %s", service_name, type(e).__name__, e,
+                exc_info=logger.isEnabledFor(logging.DEBUG)
+            )
+            raise OpenAIServiceError(f"Error calling {service_name} API: {str(e)}")
+    
+    async def generate_completion_stream(self,
+                                         messages: List[Dict[str, str]],
+                                         model: Optional[str] = None,
+                                         max_tokens: Optional[int] = None,
+                                         temperature: Optional[float] = None,
+                                         user: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream a completion from OpenAI or Azure OpenAI as it is generated
+        
+        Args:
+            messages: List of message dictionaries with role and content
+            model: Optional model to use (ignored for Azure, which uses deployments)
+            max_tokens: Optional max tokens parameter
+            temperature: Optional temperature parameter
+            user: Optional stable identifier sent as the user field
+            
+        Yields:
+            Pieces of generated text in the order they are produced
+            
+        Raises:
+            OpenAIServiceError: If there's an error calling the API
+        """
+        service_name = "Azure OpenAI" if self.use_azure else "OpenAI"
+        try:
+            logger.debug("Streaming completion using %s", service_name)
+            params = self._build_completion_params(messages, model, max_tokens, temperature, user)
+            self._ensure_open()
+            
+            # Same call as generate_completion, but the response arrives in chunks;
+            # the call counts against the concurrency limit until the stream ends
+            async with self._semaphore:
+                stream = await self.client.chat.completions.create(**params, stream=True)
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+                    
+        except Exception as e:
+            logger.error(
+                "Error calling %s API (%s): %s", service_name, type(e).__name__, e,
+                exc_info=logger.isEnabledFor(logging.DEBUG)
+            )
+            raise OpenAIServiceError(f"Error calling {service_name} API: {str(e)}")
+
+# Service shared by every router so the process keeps a single connection pool
+_shared_ai_service: Optional[AIService] = None
+
+def get_shared_ai_service(settings) -> AIService:
+    """
+    Get the process-wide AIService, creating it on first use
+    
+    Args:
+        settings: Settings object with API configuration, used on first call
+        
+    Returns:
+        The shared AIService instance
+    """
+    global _shared_ai_service
+    if _shared_ai_service is None:
+        _shared_ai_service = AIService(settings, max_concurrency=settings.openai_max_concurrency)
+    return _shared_ai_service
+
+async def close_shared_ai_service() -> None:
+    """Close the process-wide AIService connection pool, if one was created"""
+    if _shared_ai_service is not None:
+        await _shared_ai_service.aclose()
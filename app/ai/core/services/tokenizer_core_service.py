@@ -1,8 +1,10 @@
 import tiktoken
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, TypedDict
 from app.config.settings import OpenAISettings
+from app.shared.cache import LRUCache, content_key
 import logging
-import traceback
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -10,13 +12,111 @@ class TokenizerError(Exception):
     """Custom exception for tokenizer service errors"""
     pass
 
+@lru_cache(maxsize=8)
+def _load_encoding(encoding_name: str) -> tiktoken.Encoding:
+    """
+    Load a tiktoken encoding once per process
+    
+    Args:
+        encoding_name: Name of the tiktoken encoding
+        
+    Returns:
+        The tiktoken encoding, shared by every TokenizerService
+    """
+    return tiktoken.get_encoding(encoding_name)
+
+# Token counts keyed on the encoding and a digest of the text, shared by every
+# TokenizerService so each pipeline stage reuses counts for the same document
+_token_count_cache = LRUCache(maxsize=1024)
+
+def _derive_usage(token_count: int, limit: int) -> Tuple[int, float, bool, bool]:
+    """
+    Derive usage figures for a token count against a limit
+    
+    Args:
+        token_count: Number of tokens in the text
+        limit: Token limit the count is measured against
+        
+    Returns:
+        Tuple of (tokens remaining, percentage used, near limit, exceeds limit);
+        tokens remaining is negative when the count is over the limit
+    """
+    percentage_used = token_count * 100 / limit
+    return limit - token_count, percentage_used, percentage_used > 75, percentage_used > 100
+
+class TokenInfo(TypedDict):
+    """Token information for a validated text"""
+    token_count: int
+    model_limit: int
+    tokens_remaining: int
+    percentage_used: float
+    model: str
+    model_family: str
+    capabilities: Dict[str, Any]
+    encoding: str
+    estimated: bool
+
 class TokenizerService:
     """Service for counting and validating tokens for OpenAI models"""
     
     def __init__(self, settings: OpenAISettings):
         self.settings = settings
+        # The model configuration does not change after the settings are loaded
+        self._model_config = settings.runtime_config
+        logger.debug("Model config received: %s", self._model_config)
+        
+        # Unpack the values validate_tokens reports once instead of on every call
+        encoding_name = self._model_config.get("encoding")
+        if not encoding_name:
+            logger.warning("No encoding found in model config, using fallback")
+            encoding_name = "cl100k_base"  # Common fallback encoding
+        self._encoding_name = encoding_name
+        self._model_limit = self._model_config.get("max_tokens", 4096)  # Default fallback
+        self._model = self._model_config.get("model", "unknown")
+        self._model_family = self._model_config.get("model_family", "unknown")
+        self._capabilities = self._model_config.get("capabilities", {})
+    
+    def _get_encoding(self, encoding_name: str) -> tiktoken.Encoding:
+        """
+        Get a tiktoken encoding, loading it only the first time it is requested
+        
+        Args:
+            encoding_name: Name of the tiktoken encoding
+            
+        Returns:
+            The tiktoken encoding
+        """
+        return _load_encoding(encoding_name)
+    
+    def _count(self, text: str, encoding_name: str) -> int:
+        """
+        Count the tokens in a text
+        
+        Special tokens are counted as plain text, which skips the
+        special-token scan done by encode()
+        
+        Args:
+            text: Text to count tokens for
+            encoding_name: Name of the tiktoken encoding
+            
+        Returns:
+            Number of tokens in the text
+        """
+        key = content_key(encoding_name, text)
+        token_count = _token_count_cache.get(key)
+        if token_count is None:
+            token_count = len(self._get_encoding(encoding_name).encode_ordinary(text))
+            _token_count_cache.set(key, token_count)
+        return token_count
+    
+    def warm_up(self) -> None:
+        """
+        Load the configured encoding and run it once so the first request
+        does not pay for reading the BPE ranks and compiling its regex
+        """
+        self._get_encoding(self._encoding_name).encode_ordinary("warmup")
     
-    def validate_tokens(self, text: str) -> Dict[str, Any]:
+    def validate_tokens(self, text: str) -> TokenInfo:
         """
         Validate text against token limits
         
@@ -24,57 +124,52 @@ class TokenizerService:
             text: Text to validate
             
         Returns:
-            Dictionary with token information
+            TokenInfo with token information
             
         Raises:
             TokenizerError: If token validation fails
         """
         try:
-            # Get model configuration
-            model_config = self.settings.model_config
-            
-            # Log configuration for debugging
-            logger.debug(f"Model config received: {model_config}")
-            
-            # Get encoding with fallback
-            encoding_name = model_config.get("encoding")
-            if not encoding_name:
-                logger.warning("No encoding found in model config, using fallback")
-                encoding_name = "cl100k_base"  # Common fallback encoding
-            
-            # Get encoding
-            encoding = tiktoken.get_encoding(encoding_name)
+            model_limit = self._model_limit
+            
+            # Every token covers at least one UTF-8 byte, so a text with no more
+            # bytes than the limit always fits and can be estimated instead of encoded.
+            # A character takes one to four bytes, so the length settles most texts
+            # and only those in between are encoded to count their bytes
+            text_length = len(text)
+            estimated = (
+                self.settings.estimate_token_counts
+                and text_length <= model_limit
+                and (text_length * 4 <= model_limit or len(text.encode("utf-8")) <= model_limit)
+            )
             
             # Count tokens
-            token_count = len(encoding.encode(text))
-            
-            # Get model limits
-            model_limit = model_config.get("max_tokens", 4096)  # Default fallback
-            context_window = model_config.get("context_window", 8192)  # Default fallback
+            if estimated:
+                token_count = self.estimate_tokens_from_characters(text_length)
+            else:
+                token_count = self._count(text, self._encoding_name)
             
             # Calculate remaining tokens
-            tokens_remaining = model_limit - token_count
-            percentage_used = (token_count / model_limit) * 100
+            tokens_remaining, percentage_used, _, _ = _derive_usage(token_count, model_limit)
             
             # Build response
-            token_info = {
+            token_info: TokenInfo = {
                 "token_count": token_count,
                 "model_limit": model_limit,
                 "tokens_remaining": tokens_remaining,
                 "percentage_used": percentage_used,
-                "model": model_config.get("model", "unknown"),
-                "model_family": model_config.get("model_family", "unknown"),
-                "capabilities": model_config.get("capabilities", {}),
-                "encoding": encoding_name
+                "model": self._model,
+                "model_family": self._model_family,
+                "capabilities": self._capabilities,
+                "encoding": self._encoding_name,
+                "estimated": estimated
             }
             
-            logger.debug(f"Token validation complete: {token_info}")
+            logger.debug("Token validation complete: %s", token_info)
             return token_info
             
         except Exception as e:
-            logger.error(f"Error validating tokens: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            logger.error(f"Error traceback: {traceback.format_exc()}")
+            logger.exception("Error validating tokens: %s", e)
             raise TokenizerError(f"Error validating tokens: {str(e)}")
     
     def count_tokens(self, text: str, model_name: Optional[str] = None) -> Dict[str, Any]:
@@ -92,31 +187,23 @@ class TokenizerService:
             TokenizerError: If there's an error counting tokens
         """
         # Input validation
-        assert text is not None, "Text cannot be None"
-        assert text.strip(), "Text cannot be empty"
+        if text is None:
+            raise TokenizerError("Text cannot be None")
+        if not text or text.isspace():
+            raise TokenizerError("Text cannot be empty")
         
         try:
             # Get model configuration
-            model_config = self.settings.model_config
-            
-            # Get the encoding
-            encoding = tiktoken.get_encoding(model_config["encoding"])
+            model_config = self._model_config
             
             # Count the tokens
-            token_count = len(encoding.encode(text))
+            token_count = self._count(text, model_config["encoding"])
             
             # Get the model's context window
             context_window = model_config["context_window"]
             
-            # Calculate percentage of context used
-            context_percentage = (token_count / context_window) * 100
-            
-            # Check if we're approaching or exceeding the limit
-            is_near_limit = context_percentage > 75
-            exceeds_limit = context_percentage > 100
-            
-            # Calculate tokens remaining
-            tokens_remaining = context_window - token_count if token_count < context_window else 0
+            # Calculate usage and check if we're approaching or exceeding the limit
+            tokens_remaining, context_percentage, is_near_limit, exceeds_limit = _derive_usage(token_count, context_window)
             
             # Return information about tokens
             return {
@@ -125,16 +212,30 @@ class TokenizerService:
                 "model_family": model_config["model_family"],
                 "model_limit": context_window,
                 "percentage_used": round(context_percentage, 2),
-                "tokens_remaining": tokens_remaining,
+                "tokens_remaining": max(tokens_remaining, 0),
                 "is_near_limit": is_near_limit,
                 "exceeds_limit": exceeds_limit,
                 "capabilities": model_config["capabilities"]
             }
-        except AssertionError as e:
-            raise TokenizerError(str(e))
         except Exception as e:
             raise TokenizerError(f"Error counting tokens: {str(e)}")
     
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count the tokens in several texts in one call
+        
+        The texts are encoded in parallel by tiktoken's thread pool, so a
+        multi-document request crosses into the tokenizer once.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Number of tokens in each text, in the same order
+        """
+        encoded = self._get_encoding(self._encoding_name).encode_ordinary_batch(texts, num_threads=os.cpu_count() or 1)
+        return [len(tokens) for tokens in encoded]
+    
     def estimate_tokens_from_characters(self, text_length: int) -> int:
         """
         Rough estimate of tokens from character count
@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Request
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Request, Response
 from app.ai.customer_intent.models.ai_customer_intent_model import CustomerIntentResponse
 from app.input_processing.core.services.file_handler_routing_logic_core_services import FileHandlerRoutingService, FileHandlerRoutingError
 from app.input_processing.markdown.services.markdown_service import MarkdownService
 from app.input_processing.docx.services.docx_service import DocxService
 from app.input_processing.txt.services.txt_service import TxtService
 from app.input_processing.core.services.input_processing_core_service import InputProcessingService, InputProcessingError
-from app.ai.core.services.tokenizer_core_service import TokenizerService, TokenizerError
+from app.ai.core.services.tokenizer_core_service import TokenInfo, TokenizerService, TokenizerError
 from app.ai.customer_intent.services.ai_customer_intent_service import CustomerIntentService
-from app.ai.core.services.ai_core_service import AIService, OpenAIServiceError
-from app.config.settings import OpenAISettings
+from app.ai.core.services.ai_core_service import get_shared_ai_service, OpenAIServiceError
+from app.config.settings import get_settings
+from app.shared.cache import LRUCache, SingleFlight, content_key
 from app.shared.logging import get_logger
-import traceback
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+import asyncio
 
 # Set up module logger
 logger = get_logger("customer_intent_router")
@@ -22,7 +23,7 @@ router = APIRouter(
 )
 
 # Initialize settings first
-openai_settings = OpenAISettings()
+openai_settings = get_settings()
 
 # Create service instances with dependencies
 file_handler_routing_service = FileHandlerRoutingService()
@@ -30,9 +31,16 @@ markdown_service = MarkdownService()
 docx_service = DocxService()
 txt_service = TxtService()
 tokenizer_service = TokenizerService(openai_settings)
-ai_service = AIService(openai_settings)
+ai_service = get_shared_ai_service(openai_settings)
 customer_intent_service = CustomerIntentService()
 
+# Token information and generated intent keyed on a digest of the processed
+# text, so an identical re-upload skips token validation and the LLM call
+intent_result_cache = LRUCache(maxsize=256, ttl=3600)
+
+# Identical intent generations already in flight, shared by concurrent callers
+inflight_intents = SingleFlight()
+
 # Custom exception for router-specific errors
 class CustomerIntentRouterError(Exception):
     """Custom exception for customer intent router errors"""
@@ -57,27 +65,28 @@ async def extract_file_content(file: UploadFile, req_logger = logger) -> str:
         # 1. Determine file type based on extension
         file_type = file_handler_routing_service.validate_file_type(file)
         
-        # 2. Read file contents
+        # 2. Extract text based on file type; extraction runs in a worker thread
+        # to keep the event loop free
+        if file_type == "docx":
+            # python-docx reads the spooled upload directly, without copying it into memory
+            file.file.seek(0)
+            return await asyncio.to_thread(docx_service.extract_text_from_stream, file.file)
+        elif file_type not in ("markdown", "text"):
+            raise CustomerIntentRouterError(f"Unsupported file type: {file_type}")
+        
+        # Text needs the whole content to fall back between encodings
         file_content = await file.read()
-        req_logger.debug(f"Read {len(file_content)} bytes from file")
+        req_logger.debug("Read %d bytes from file", len(file_content))
         
-        # 3. Extract text based on file type
         if file_type == "markdown":
-            return markdown_service.extract_text(file_content)
-        elif file_type == "docx":
-            return docx_service.extract_text(file_content)
-        elif file_type == "text":
-            return txt_service.extract_text(file_content)
-        else:
-            raise CustomerIntentRouterError(f"Unsupported file type: {file_type}")
+            return await asyncio.to_thread(markdown_service.extract_text, file_content)
+        return await asyncio.to_thread(txt_service.extract_text, file_content)
             
     except FileHandlerRoutingError as e:
-        req_logger.error(f"File handler routing error: {str(e)}")
+        req_logger.error("File handler routing error: %s", e)
         raise CustomerIntentRouterError(f"Invalid file type: {str(e)}")
     except Exception as e:
-        req_logger.error(f"Error processing file: {str(e)}")
-        req_logger.error(f"Error type: {type(e)}")
-        req_logger.error(f"Error traceback: {traceback.format_exc()}")
+        req_logger.exception("Error processing file: %s", e)
         raise CustomerIntentRouterError(f"Error processing file: {str(e)}")
 
 def process_text(text: str, req_logger = logger) -> str:
@@ -94,26 +103,26 @@ def process_text(text: str, req_logger = logger) -> str:
     Raises:
         CustomerIntentRouterError: If text processing fails
     """
+    # Validate the text
+    if not text:
+        raise CustomerIntentRouterError("Document text cannot be empty")
+    
     try:
-        # Validate the text
-        assert text, "Document text cannot be empty"
-        
         # Process the text using static method
         req_logger.debug("Processing document text from file")
         processed_text = InputProcessingService.process_text(text)
-        
-        # Validate the result
-        assert processed_text, "Processed text cannot be empty"
-        
-        return processed_text
     except InputProcessingError as e:
         raise CustomerIntentRouterError(f"Error processing text: {str(e)}")
-    except AssertionError as e:
-        raise CustomerIntentRouterError(str(e))
     except Exception as e:
         raise CustomerIntentRouterError(f"Error processing text: {str(e)}")
+    
+    # Validate the result
+    if not processed_text:
+        raise CustomerIntentRouterError("Processed text cannot be empty")
+    
+    return processed_text
 
-def validate_token_count(processed_text: str, req_logger = logger) -> Dict[str, Any]:
+def validate_token_count(processed_text: str, req_logger = logger) -> TokenInfo:
     """
     Validate text against token limits
     
@@ -129,36 +138,34 @@ def validate_token_count(processed_text: str, req_logger = logger) -> Dict[str,
     """
     try:
         # Log input details
-        req_logger.debug(f"Validating tokens for text length: {len(processed_text)}")
-        req_logger.debug(f"First 100 chars of text: {processed_text[:100]}...")
+        req_logger.debug("Validating tokens for text length: %d", len(processed_text))
+        req_logger.debug("First 100 chars of text: %.100s...", processed_text)
         
         # Log model configuration
-        req_logger.debug(f"Current model: {openai_settings.default_model}")
-        print(f"Current model: {openai_settings.default_model}")
-        req_logger.debug(f"Model encoding: {openai_settings.encoding}")
+        req_logger.debug("Current model: %s", openai_settings.default_model)
+        req_logger.debug("Model encoding: %s", openai_settings.encoding)
         
         # Validate tokens using tokenizer service
         req_logger.debug("Calling tokenizer service validate_tokens")
         token_info = tokenizer_service.validate_tokens(processed_text)
         
         # Log token counts and model info
-        req_logger.info(f"Token count: {token_info['token_count']}/{token_info['model_limit']} ({token_info['percentage_used']}%)")
-        req_logger.info(f"Using model: {token_info['model']} ({token_info['model_family']})")
-        req_logger.debug(f"Model capabilities: {token_info['capabilities']}")
-        req_logger.debug(f"Full token info: {token_info}")
+        req_logger.info(
+            "Token count: %s/%s (%s%%)",
+            token_info['token_count'], token_info['model_limit'], token_info['percentage_used']
+        )
+        req_logger.info("Using model: %s (%s)", token_info['model'], token_info['model_family'])
+        req_logger.debug("Model capabilities: %s", token_info['capabilities'])
+        req_logger.debug("Full token info: %s", token_info)
         
         # Return token information
         return token_info
         
     except TokenizerError as e:
-        req_logger.error(f"Tokenizer error: {str(e)}")
-        req_logger.error(f"Error type: {type(e)}")
-        req_logger.error(f"Error traceback: {traceback.format_exc()}")
+        req_logger.exception("Tokenizer error: %s", e)
         raise CustomerIntentRouterError(f"Tokenizer error: {str(e)}")
     except Exception as e:
-        req_logger.error(f"Unexpected error in token validation: {str(e)}")
-        req_logger.error(f"Error type: {type(e)}")
-        req_logger.error(f"Error traceback: {traceback.format_exc()}")
+        req_logger.exception("Unexpected error in token validation: %s", e)
         if isinstance(e, CustomerIntentRouterError):
             raise
         raise CustomerIntentRouterError(f"Error validating token count: {str(e)}")
@@ -177,10 +184,11 @@ async def generate_intent(processed_text: str, req_logger = logger) -> Dict[str,
     Raises:
         CustomerIntentRouterError: If intent generation fails
     """
+    # Validate inputs
+    if not processed_text:
+        raise CustomerIntentRouterError("Text cannot be empty for intent generation")
+    
     try:
-        # Validate inputs
-        assert processed_text, "Text cannot be empty for intent generation"
-        
         # Generate the prompt
         req_logger.info("Generating customer intent prompt")
         messages = customer_intent_service.format_customer_intent_prompt(processed_text)
@@ -190,13 +198,13 @@ async def generate_intent(processed_text: str, req_logger = logger) -> Dict[str,
         completion = await ai_service.generate_completion(messages=messages["messages"])
         
         # Validate the result
-        assert "text" in completion, "Text missing from completion"
-        assert "model" in completion, "Model missing from completion"
-        assert "usage" in completion, "Usage missing from completion"
+        for key in ("text", "model", "usage"):
+            if key not in completion:
+                raise CustomerIntentRouterError(f"{key.capitalize()} missing from completion")
         
         # Log completion stats
-        req_logger.info(f"Intent generated using model: {completion['model']}")
-        req_logger.debug(f"Usage stats: {completion['usage']}")
+        req_logger.info("Intent generated using model: %s", completion['model'])
+        req_logger.debug("Usage stats: %s", completion['usage'])
         
         # Format the result
         return {
@@ -209,14 +217,29 @@ async def generate_intent(processed_text: str, req_logger = logger) -> Dict[str,
         raise CustomerIntentRouterError(f"AI service error: {str(e)}")
     except ValueError as e:
         raise CustomerIntentRouterError(f"Invalid input: {str(e)}")
-    except AssertionError as e:
-        raise CustomerIntentRouterError(str(e))
     except Exception as e:
         if isinstance(e, CustomerIntentRouterError):
             raise
         raise CustomerIntentRouterError(f"Error generating intent: {str(e)}")
 
-def format_response(intent_result: Dict[str, Any], token_info: Dict[str, Any], processed_text: str, req_logger = logger) -> CustomerIntentResponse:
+async def _validate_and_generate(processed_text: str, text_key: str, req_logger = logger) -> Tuple[TokenInfo, Dict[str, Any]]:
+    """
+    Validate the token count and generate the intent for text not yet cached
+    
+    Args:
+        processed_text: The processed text to generate intent from
+        text_key: Content key of the processed text
+        req_logger: Logger to use (defaults to module logger)
+        
+    Returns:
+        Tuple of token information and intent generation result
+    """
+    token_info = await asyncio.to_thread(validate_token_count, processed_text, req_logger)
+    intent_result = await generate_intent(processed_text, req_logger)
+    intent_result_cache.set(text_key, (token_info, intent_result))
+    return token_info, intent_result
+
+def format_response(intent_result: Dict[str, Any], token_info: TokenInfo, processed_text: str, req_logger = logger) -> CustomerIntentResponse:
     """
     Format the final response
     
@@ -230,22 +253,10 @@ def format_response(intent_result: Dict[str, Any], token_info: Dict[str, Any], p
         Formatted CustomerIntentResponse
     """
     try:
-        # Validate inputs
-        assert intent_result is not None, "Intent result cannot be None"
-        assert token_info is not None, "Token info cannot be None"
-        assert processed_text is not None, "Processed text cannot be None"
-        assert "intent" in intent_result, "Intent must be in result"
-        assert "model" in intent_result, "Model must be in result"
-        assert "usage" in intent_result, "Usage must be in result"
-        assert "model_limit" in token_info, "Model limit must be in token info"
-        assert "token_count" in token_info, "Token count must be in token info"
-        assert "tokens_remaining" in token_info, "Remaining tokens must be in token info"
-        assert "model_family" in token_info, "Model family must be in token info"
-        assert "capabilities" in token_info, "Capabilities must be in token info"
-        
-        # Create response
+        # Create response; a missing field surfaces as a KeyError. The values come
+        # from the tokenizer and the checked completion, so skip revalidation
         req_logger.debug("Formatting response")
-        return CustomerIntentResponse(
+        return CustomerIntentResponse.model_construct(
             intent=intent_result["intent"],
             model=intent_result["model"],
             model_family=token_info["model_family"],
@@ -256,8 +267,8 @@ def format_response(intent_result: Dict[str, Any], token_info: Dict[str, Any], p
             remaining_tokens=token_info["tokens_remaining"],
             text_used=processed_text
         )
-    except AssertionError as e:
-        raise CustomerIntentRouterError(f"Error formatting response: {str(e)}")
+    except KeyError as e:
+        raise CustomerIntentRouterError(f"Error formatting response: missing {e}")
     except Exception as e:
         raise CustomerIntentRouterError(f"Error formatting response: {str(e)}")
 
@@ -265,7 +276,7 @@ def format_response(intent_result: Dict[str, Any], token_info: Dict[str, Any], p
 async def generate_customer_intent(
     request: Request,
     file: UploadFile = File(...)
-):
+) -> Response:
     """
     Generate a customer intent statement based on an uploaded document.
     
@@ -287,38 +298,49 @@ async def generate_customer_intent(
         # 1. Process file content
         document_text = await extract_file_content(file, req_logger)
         
-        # 2. Process text for LLM
-        processed_text = process_text(document_text, req_logger)
-        
-        # 3. Validate token count
-        token_info = validate_token_count(processed_text, req_logger)
-        
-        # 4. Generate customer intent
-        intent_result = await generate_intent(processed_text, req_logger)
+        # 2. Process text for LLM; text processing and token counting are CPU
+        # bound, so they run in a worker thread to keep the event loop free
+        processed_text = await asyncio.to_thread(process_text, document_text, req_logger)
+        
+        # 3-4. Validate token count and generate customer intent; the text is
+        # hashed once here and the digest keys both the cache and in-flight calls
+        text_key = content_key(processed_text)
+        cached = intent_result_cache.get(text_key)
+        if cached is None:
+            cached = await inflight_intents.do(
+                text_key,
+                lambda: _validate_and_generate(processed_text, text_key, req_logger)
+            )
+        else:
+            req_logger.info("Reusing cached customer intent for identical text")
+        token_info, intent_result = cached
         
         # 5. Format and return response
         response = format_response(intent_result, token_info, processed_text, req_logger)
         req_logger.info("Customer intent generation completed successfully")
-        return response
+        
+        # Encode with the model's compiled serializer and return the bytes directly;
+        # text_used echoes the whole document, so skipping FastAPI's revalidation
+        # and jsonable_encoder pass matters for large uploads
+        return Response(content=response.model_dump_json(), media_type="application/json")
         
     except CustomerIntentRouterError as e:
         # Handle router-specific errors
-        req_logger.error(f"Customer intent router error: {str(e)}")
+        req_logger.error("Customer intent router error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except OpenAIServiceError as e:
         # Handle OpenAI service errors
-        req_logger.error(f"OpenAI service error: {str(e)}")
+        req_logger.error("OpenAI service error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Error calling AI service: {str(e)}"
         )
     except Exception as e:
         # Handle unexpected errors
-        req_logger.error(f"Unexpected error in customer intent generation: {str(e)}")
-        req_logger.error(f"Traceback: {traceback.format_exc()}")
+        req_logger.exception("Unexpected error in customer intent generation: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while generating the customer intent"
@@ -1,25 +1,8 @@
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
-class CustomerIntentService:
-    """Service for creating prompts for customer intent generation"""
-    
-    def format_customer_intent_prompt(self, document_text: str, user_type: Optional[str] = None) -> Dict[str, Any]:
-        """
-        Format the prompt for customer intent generation using best practices
-        
-        Args:
-            document_text: The document text to use as the basis for the intent
-            user_type: Optional specific user type to focus on
-            
-        Returns:
-            Dictionary containing system message and user message for chat completion
-        """
-        # Input validation
-        if not document_text or not document_text.strip():
-            raise ValueError("Document text cannot be empty")
-        
-        # System message to set context and behavior
-        system_message = """You are an expert at analyzing documents and creating clear, concise customer intent statements.
+# System message to set context and behavior; it does not depend on the request
+_SYSTEM_MESSAGE = """You are an expert at analyzing documents and creating clear, concise customer intent statements.
 Your task is to create a customer intent statement that follows the format: "As a [user type], I want to [action] because [reason]"
 
 Guidelines for creating customer intents:
@@ -40,23 +23,63 @@ Example bad customer intents:
 "As a user, I want to use the system because it's good" (too vague)
 "As a developer, I want to implement features because the code needs it" (not user-focused)"""
 
-        # User message with the document content
-        user_message = f"""Please analyze the following document and create a customer intent statement following the format and guidelines above.
+# Opening of the user message, with and without a specific user type
+_USER_REQUEST = (
+    "Please analyze the following document and create a customer intent statement "
+    "following the format and guidelines above."
+)
+_USER_REQUEST_FOR_TYPE = (
+    "Please analyze the following document and create a customer intent statement "
+    "for a {user_type}, following the format and guidelines above."
+)
 
-Document content:
-{document_text}"""
+# Text placed between the opening and the document content
+_DOCUMENT_HEADER = "\n\nDocument content:\n"
 
-        # If user_type is provided, add it to the user message
-        if user_type:
-            user_message = f"""Please analyze the following document and create a customer intent statement for a {user_type}, following the format and guidelines above.
+# Everything before the document content when no user type is given
+_GENERIC_PREFIX = _USER_REQUEST + _DOCUMENT_HEADER
 
-Document content:
-{document_text}"""
+@lru_cache(maxsize=128)
+def _typed_prefix(user_type: str) -> str:
+    """
+    Build everything before the document content for a specific user type
+    
+    Args:
+        user_type: User type to focus the intent on
+        
+    Returns:
+        Opening of the user message followed by the document header
+    """
+    return _USER_REQUEST_FOR_TYPE.format(user_type=user_type) + _DOCUMENT_HEADER
 
+class CustomerIntentService:
+    """Service for creating prompts for customer intent generation"""
+    
+    def format_customer_intent_prompt(self, document_text: str, user_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Format the prompt for customer intent generation using best practices
+        
+        Args:
+            document_text: The document text to use as the basis for the intent
+            user_type: Optional specific user type to focus on
+            
+        Returns:
+            Dictionary containing system message and user message for chat completion
+        """
+        # Input validation; isspace stops at the first visible character instead
+        # of copying the whole document the way strip() does
+        if not document_text or document_text.isspace():
+            raise ValueError("Document text cannot be empty")
+        
+        # User message with the document content; the text before the document
+        # is prebuilt, so only one concatenation runs per call
+        prefix = _typed_prefix(user_type) if user_type else _GENERIC_PREFIX
+        user_message = prefix + document_text
+        
         # Return messages in OpenAI chat format
         return {
             "messages": [
-                {"role": "system", "content": system_message},
+                {"role": "system", "content": _SYSTEM_MESSAGE},
                 {"role": "user", "content": user_message}
             ]
-        } 
\ No newline at end of file
+        }
\ No newline at end of file
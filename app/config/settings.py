@@ -1,28 +1,42 @@
 from pydantic import field_validator, ConfigDict, Field, model_validator
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
-from typing import Optional, Dict, Any
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
 import tiktoken
-import os
-
-# Debug: Print current working directory and .env file location
-print(f"Current working directory: {os.getcwd()}")
-env_path = os.path.join(os.getcwd(), '.env')
-print(f"Looking for .env file at: {env_path}")
-print(f".env file exists: {os.path.exists(env_path)}")
 
 # Load environment variables from .env file with override
 load_dotenv(override=True)
 
-# Debug: Print all environment variables
-print("\nEnvironment variables:")
-for key, value in os.environ.items():
-    if key.startswith('OPENAI_'):
-        print(f"{key}: {value}")
+@lru_cache(maxsize=8)
+def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
+    """Load a tiktoken encoding once per process, shared by every settings instance"""
+    return tiktoken.get_encoding(encoding_name)
 
-# Get the model from environment variable
-DEFAULT_MODEL = os.getenv('OPENAI_DEFAULT_MODEL', 'gpt-4')
-print(f"\nLoading model from .env: {DEFAULT_MODEL}")
+# Capabilities per model family, read-only so every settings instance can share them
+_MODEL_CAPABILITIES: Dict[str, Mapping[str, bool]] = {
+    "gpt": MappingProxyType({
+        "supports_functions": True,
+        "supports_vision": False,
+        "supports_embeddings": True
+    }),
+    "o1": MappingProxyType({
+        "supports_functions": True,
+        "supports_vision": True,
+        "supports_embeddings": True
+    }),
+    "o3": MappingProxyType({
+        "supports_functions": True,
+        "supports_vision": True,
+        "supports_embeddings": True
+    }),
+    "unknown": MappingProxyType({
+        "supports_functions": False,
+        "supports_vision": False,
+        "supports_embeddings": False
+    })
+}
 
 class OpenAISettings(BaseSettings):
     """Settings for OpenAI API integration"""
@@ -34,14 +48,21 @@ class OpenAISettings(BaseSettings):
     encoding: str = Field("cl100k_base")
     max_tokens: int = Field(4000, validation_alias="MAX_TOKENS")
     temperature: float = Field(0.7, validation_alias="OPENAI_TEMPERATURE")
+    llm_max_concurrency: int = Field(8, validation_alias="LLM_MAX_CONCURRENCY")
+    openai_max_concurrency: int = Field(32, validation_alias="OPENAI_MAX_CONCURRENCY")
+    openai_read_timeout: float = Field(600.0, validation_alias="OPENAI_READ_TIMEOUT")
+    estimate_token_counts: bool = Field(False, validation_alias="ESTIMATE_TOKEN_COUNTS")
+    content_types_batch_window_ms: int = Field(0, validation_alias="CONTENT_TYPES_BATCH_WINDOW_MS")
+    content_types_batch_size: int = Field(8, validation_alias="CONTENT_TYPES_BATCH_SIZE")
     
     # Azure OpenAI settings
     azure_endpoint: Optional[str] = Field(None, validation_alias="AZURE_OPENAI_ENDPOINT")
     azure_deployment_name: Optional[str] = Field(None, validation_alias="AZURE_OPENAI_DEPLOYMENT_NAME")
     azure_api_version: str = Field("2023-12-01-preview", validation_alias="AZURE_OPENAI_API_VERSION")
     
-    # Configuration mode detection
-    @property
+    # Configuration mode detection; the credentials are fixed once the settings
+    # are loaded, so the result is computed on first access and kept
+    @cached_property
     def use_azure(self) -> bool:
         """Determine if we should use Azure OpenAI based on available configuration"""
         return bool(self.azure_endpoint and self.azure_deployment_name)
@@ -60,8 +81,8 @@ class OpenAISettings(BaseSettings):
         
         return self
     
-    @property
-    def model_config(self) -> Dict[str, Any]:
+    @cached_property
+    def runtime_config(self) -> Dict[str, Any]:
         """Dynamic model configuration based on selected provider"""
         # Base configuration that works for both
         config = {
@@ -93,33 +114,31 @@ class OpenAISettings(BaseSettings):
         
         return config
     
-    model_config = {
-        "env_file": ".env",
-        "extra": "ignore",  # Ignore extra env vars
-        "protected_namespaces": ("settings_",)  # Avoid model_encoding conflict with model_ prefix
-    }
+    # Settings are read-only once loaded, which also makes the cached
+    # properties below safe to keep for the lifetime of the instance
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",  # Ignore extra env vars
+        frozen=True,
+        protected_namespaces=("settings_",)  # Avoid model_encoding conflict with model_ prefix
+    )
     
-    @property
+    # The default model is fixed once the settings are loaded, so values derived
+    # from it are computed on first access and kept
+    @cached_property
     def model_family(self) -> str:
         """Get the model family (gpt, o1, o3, etc.)"""
-        return self.default_model.split('-')[0]
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        print(f"OpenAISettings initialized with default_model: {self.default_model}")
-        print(f"Environment variables loaded: OPENAI_DEFAULT_MODEL={os.environ.get('OPENAI_DEFAULT_MODEL')}")
-        print(f"Model family: {self.model_family}")
-        print(f"Using max_tokens parameter consistently across all model families")
+        return self.default_model.partition('-')[0]
     
-    @property
+    @cached_property
     def model_settings(self) -> Dict[str, Any]:
         """Dynamically get configuration for the configured model"""
         try:
             # Get base model family
-            model_family = self.default_model.split('-')[0]
+            model_family = self.model_family
             
             # Get encoding
-            encoding = tiktoken.get_encoding(self.encoding)
+            encoding = _get_encoding(self.encoding)
             
             # Determine context window based on model family
             context_window = encoding.max_tokens
@@ -147,28 +166,19 @@ class OpenAISettings(BaseSettings):
                 "capabilities": self._get_model_capabilities("unknown")
             }
     
-    def _get_model_capabilities(self, model_family: str) -> Dict[str, bool]:
+    def _get_model_capabilities(self, model_family: str) -> Mapping[str, bool]:
         """Get model capabilities based on family"""
-        capabilities = {
-            "gpt": {
-                "supports_functions": True,
-                "supports_vision": False,
-                "supports_embeddings": True
-            },
-            "o1": {
-                "supports_functions": True,
-                "supports_vision": True,
-                "supports_embeddings": True
-            },
-            "o3": {
-                "supports_functions": True,
-                "supports_vision": True,
-                "supports_embeddings": True
-            },
-            "unknown": {
-                "supports_functions": False,
-                "supports_vision": False,
-                "supports_embeddings": False
-            }
-        }
-        return capabilities.get(model_family, capabilities["unknown"]) 
\ No newline at end of file
+        return _MODEL_CAPABILITIES.get(model_family, _MODEL_CAPABILITIES["unknown"])
+
+@lru_cache(maxsize=1)
+def get_settings() -> OpenAISettings:
+    """
+    Get the settings shared by the whole process
+    
+    The environment and .env file are read and validated on the first call;
+    later calls return the same frozen instance.
+    
+    Returns:
+        The process-wide OpenAISettings
+    """
+    return OpenAISettings()
@@ -0,0 +1,23 @@
+import codecs
+from typing import Tuple
+
+def decode_text(file_content: bytes) -> Tuple[str, str]:
+    """
+    Decode uploaded text content, preferring UTF-8
+    
+    A UTF-8 byte order mark selects utf-8-sig so the mark is not kept in the
+    text. Content that is not valid UTF-8 is decoded as latin-1, which accepts
+    any byte sequence, so the content is decoded at most twice and decoding
+    itself never fails.
+    
+    Args:
+        file_content: Binary content of the uploaded file
+    
+    Returns:
+        Tuple of the decoded text and the name of the encoding used
+    """
+    encoding = 'utf-8-sig' if file_content.startswith(codecs.BOM_UTF8) else 'utf-8'
+    try:
+        return file_content.decode(encoding), encoding
+    except UnicodeDecodeError:
+        return file_content.decode('latin-1'), 'latin-1'
@@ -1,8 +1,6 @@
-import os
 from typing import Optional
 from fastapi import UploadFile
 import logging
-import traceback
 
 # Set up module logger
 logger = logging.getLogger(__name__)
@@ -32,6 +30,9 @@ class FileHandlerRoutingService:
         ".txt": "text",
     }
     
+    # File types allowed when the caller does not restrict them
+    ALLOWED_FILE_TYPES = frozenset(FILE_EXTENSIONS_DICT.values())
+    
     @staticmethod
     def get_file_extension(filename: str) -> str:
         """
@@ -49,8 +50,13 @@ class FileHandlerRoutingService:
         if not filename:
             raise FileHandlerRoutingError("Filename cannot be empty")
             
-        _, ext = os.path.splitext(filename.lower())
-        return ext
+        # Same result as os.path.splitext(filename.lower()), but only the
+        # extension is lowercased rather than a copy of the whole filename;
+        # dots in directory names and leading dots do not start an extension
+        head, dot, ext = filename.rpartition('.')
+        if not dot or '/' in ext or not head.rpartition('/')[2].lstrip('.'):
+            return ""
+        return '.' + ext.lower()
     
     @staticmethod
     def get_file_type(filename: str) -> str:
@@ -82,7 +88,7 @@ class FileHandlerRoutingService:
         
         Args:
             uploaded_file: Uploaded file to validate
-            allowed_types: List of allowed file types
+            allowed_types: Collection of allowed file types (defaults to all supported types)
             
         Returns:
             Determined file type if valid
@@ -92,10 +98,10 @@ class FileHandlerRoutingService:
         """
         try:
             # Log file details
-            logger.info(f"Processing file: {uploaded_file.filename} (content_type: {uploaded_file.content_type})")
+            logger.info("Processing file: %s (content_type: %s)", uploaded_file.filename, uploaded_file.content_type)
             
             if allowed_types is None:
-                allowed_types = list(set(FileHandlerRoutingService.FILE_EXTENSIONS_DICT.values()))
+                allowed_types = FileHandlerRoutingService.ALLOWED_FILE_TYPES
                 
             file_type = FileHandlerRoutingService.get_file_type(uploaded_file.filename)
             
@@ -105,11 +111,9 @@ class FileHandlerRoutingService:
                 logger.error(error_msg)
                 raise FileHandlerRoutingError(error_msg)
                 
-            logger.info(f"Processing file of type: {file_type}")
+            logger.info("Processing file of type: %s", file_type)
             return file_type
             
         except Exception as e:
-            logger.error(f"Error validating file type: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            logger.error(f"Error traceback: {traceback.format_exc()}")
+            logger.exception("Error validating file type: %s", e)
             raise FileHandlerRoutingError(f"Error validating file type: {str(e)}")
\ No newline at end of file
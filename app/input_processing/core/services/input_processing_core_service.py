@@ -1,6 +1,14 @@
 import re
 from typing import Optional, Dict
 
+# Patterns used on every document, compiled once at import
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+_MULTI_SPACE_RE = re.compile(r' {2,}')
+
+# Any ASCII text sanitize_text would change: a control character other than tab
+# and newline (carriage returns included) or a run of spaces
+_NEEDS_SANITIZING_RE = re.compile(r'[\x00-\x08\x0B-\x1F\x7F]| {2}')
+
 class InputProcessingError(Exception):
     """Custom exception for input processing errors"""
     pass
@@ -11,8 +19,8 @@ class InputProcessingService:
     # Constants for character handling
     CONTROL_CHARS_TO_KEEP = {'\t', '\n', '\r'}  # ASCII 9, 10, 13
     QUOTE_MAPPINGS: Dict[str, str] = {
-        '"': '"', '"': '"',
-        ''': "'", ''': "'"
+        '\u201c': '"', '\u201d': '"',
+        '\u2018': "'", '\u2019': "'"
     }
     SPECIAL_CHAR_MAPPINGS: Dict[str, str] = {
         '—': '--', '–': '-',
@@ -31,14 +39,14 @@ class InputProcessingService:
         """
         Remove problematic control characters while preserving tabs and newlines
         """
-        return re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+        return _CONTROL_CHARS_RE.sub('', text)
     
     @staticmethod
     def normalize_whitespace(text: str) -> str:
         """
         Normalize whitespace while preserving paragraph breaks
         """
-        return re.sub(r' {2,}', ' ', text)
+        return _MULTI_SPACE_RE.sub(' ', text)
     
     @staticmethod
     def normalize_quotes(text: str) -> str:
@@ -58,34 +66,36 @@ class InputProcessingService:
             text = text.replace(unicode_char, ascii_char)
         return text
     
-    @staticmethod
-    def escape_backslashes(text: str) -> str:
-        """
-        Escape backslashes for JSON response
-        """
-        return text.replace('\\', '\\\\')
-    
     @staticmethod
     def sanitize_text(content: str) -> str:
         """
-        Sanitize text for API response
+        Normalize text for the LLM and API response
+        
+        Line breaks, control characters, whitespace, quotes and special
+        characters are normalized; nothing is escaped, since the JSON encoder
+        escapes the text when the response is serialized.
 
         Args:
             content: Raw text content
             
         Returns:
-            Sanitized text
+            Normalized text
         """
         if not content:
             return ""
+        
+        # Every quote and special character mapped below is non-ASCII, so clean
+        # ASCII text (the common case for uploads) is returned as is
+        if content.isascii() and not _NEEDS_SANITIZING_RE.search(content):
+            return content
             
-        # Apply transformations in specific order
-        text = InputProcessingService.normalize_line_breaks(content)
-        text = InputProcessingService.remove_control_chars(text)
-        text = InputProcessingService.normalize_whitespace(text)
-        text = InputProcessingService.normalize_quotes(text)
-        text = InputProcessingService.normalize_special_chars(text)
-        text = InputProcessingService.escape_backslashes(text)
+        # Same result as applying normalize_line_breaks, remove_control_chars,
+        # normalize_whitespace, normalize_quotes and normalize_special_chars in
+        # order, but every per-character substitution is done in a single
+        # translate pass. No substitution produces a space, so collapsing
+        # spaces afterwards still sees the removed control characters.
+        text = content.replace('\r\n', '\n').translate(_SANITIZE_TABLE)
+        text = _MULTI_SPACE_RE.sub(' ', text)
         
         return text
     
@@ -94,7 +104,7 @@ class InputProcessingService:
         """
         Validate text content
         """
-        if content is None or content.strip() == '':
+        if not content or content.isspace():
             raise InputProcessingError("Content cannot be empty")
     
     @staticmethod
@@ -112,11 +122,21 @@ class InputProcessingService:
             # Validate the content
             InputProcessingService.validate_text(content)
             
-            # Escape the content for JSON response
+            # Normalize the content for the LLM and the response
             processed_content = InputProcessingService.sanitize_text(content)
             
             return processed_content
         except Exception as e:
             if isinstance(e, InputProcessingError):
                 raise
-            raise InputProcessingError(f"Error processing text: {str(e)}") 
\ No newline at end of file
+            raise InputProcessingError(f"Error processing text: {str(e)}") 
+
+# Per-character substitutions made by sanitize_text: lone carriage returns become
+# newlines, control characters other than tab and newline are dropped, and quotes
+# and special characters are replaced with their ASCII equivalents
+_SANITIZE_TABLE = str.maketrans({
+    '\r': '\n',
+    **{chr(code): None for code in [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F]},
+    **InputProcessingService.QUOTE_MAPPINGS,
+    **InputProcessingService.SPECIAL_CHAR_MAPPINGS
+})
@@ -1,12 +1,32 @@
 import docx
 import io
 import logging
-import traceback
-from typing import Optional
+from lxml import etree
+from typing import BinaryIO, Optional
 
 # Set up module logger
 logger = logging.getLogger(__name__)
 
+# WordprocessingML namespace and the run child tags that carry paragraph text
+_W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_W_T = f"{{{_W_NAMESPACE}}}t"
+_W_TAB = f"{{{_W_NAMESPACE}}}tab"
+
+# Paragraphs directly under an element: for the body, the same ones doc.paragraphs
+# wraps; for a table cell, the ones python-docx's cell.text joins
+_CHILD_PARAGRAPHS = etree.XPath("./w:p", namespaces={"w": _W_NAMESPACE})
+
+# Rows of the tables directly in the body (the ones doc.tables wraps) and cells of a row
+_BODY_TABLE_ROWS = etree.XPath("./w:tbl/w:tr", namespaces={"w": _W_NAMESPACE})
+_ROW_CELLS = etree.XPath("./w:tc", namespaces={"w": _W_NAMESPACE})
+
+# Text, tab and break elements of a paragraph's runs in document order, which is
+# what python-docx's Paragraph.text reads, selected in one libxml2 call
+_PARAGRAPH_TEXT_NODES = etree.XPath(
+    "./w:r/w:t | ./w:r/w:tab | ./w:r/w:br | ./w:r/w:cr",
+    namespaces={"w": _W_NAMESPACE}
+)
+
 class DocxServiceError(Exception):
     """Custom exception for document parsing errors"""
     pass
@@ -25,47 +45,85 @@ class DocxService:
         Returns:
             String containing all text from the document
             
+        Raises:
+            DocxServiceError: If there's an error reading the document
+        """
+        logger.debug("File content size: %d bytes", len(file_content))
+        return DocxService.extract_text_from_stream(io.BytesIO(file_content))
+    
+    @staticmethod
+    def _paragraph_text(paragraph: etree._Element) -> str:
+        """
+        Get the text of a paragraph element the way python-docx's Paragraph.text does
+        
+        Args:
+            paragraph: w:p element
+            
+        Returns:
+            Text of the paragraph's runs, with tabs as \\t and breaks as \\n
+        """
+        return "".join(
+            (node.text or "") if node.tag == _W_T else ("\t" if node.tag == _W_TAB else "\n")
+            for node in _PARAGRAPH_TEXT_NODES(paragraph)
+        )
+    
+    @staticmethod
+    def extract_text_from_stream(stream: BinaryIO) -> str:
+        """
+        Extract raw text from a .docx document read from a seekable binary stream
+        
+        Reading an uploaded file this way avoids copying its content into memory first
+        
+        Args:
+            stream: Seekable binary stream positioned at the start of the .docx file
+            
+        Returns:
+            String containing all text from the document
+            
         Raises:
             DocxServiceError: If there's an error reading the document
         """
         try:
             # Log start of processing
             logger.info("Starting DOCX text extraction")
-            logger.debug(f"File content size: {len(file_content)} bytes")
             
-            # Load the document from bytes
-            doc = docx.Document(io.BytesIO(file_content))
+            # Load the document from the stream
+            doc = docx.Document(stream)
             logger.debug("Successfully created DOCX document object")
             
-            # Extract text from all paragraphs
+            # Extract text from all paragraphs straight from the XML, without
+            # building python-docx paragraph and run objects
+            body = doc.element.body
+            paragraphs = _CHILD_PARAGRAPHS(body)
             text_parts = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-                    logger.debug(f"Processed paragraph: {len(paragraph.text)} chars")
+            for paragraph in paragraphs:
+                paragraph_text = DocxService._paragraph_text(paragraph)
+                if paragraph_text and not paragraph_text.isspace():
+                    text_parts.append(paragraph_text)
             
-            # Extract text from all tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_texts = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_texts.append(cell.text.strip())
-                    if row_texts:
-                        text_parts.append(" | ".join(row_texts))
+            # Extract text from all tables the same way, one line per row with
+            # the non-empty cells separated by pipes
+            for row in _BODY_TABLE_ROWS(body):
+                row_texts = []
+                for cell in _ROW_CELLS(row):
+                    cell_text = "\n".join(
+                        DocxService._paragraph_text(paragraph) for paragraph in _CHILD_PARAGRAPHS(cell)
+                    ).strip()
+                    if cell_text:
+                        row_texts.append(cell_text)
+                if row_texts:
+                    text_parts.append(" | ".join(row_texts))
             
             # Join all text parts with newlines
             extracted_text = "\n".join(text_parts)
-            logger.info(f"Successfully extracted {len(extracted_text)} characters from {len(text_parts)} paragraphs")
+            logger.info("Successfully extracted %d characters from %d paragraphs", len(extracted_text), len(text_parts))
             
             # Log some statistics
-            logger.debug(f"Number of paragraphs: {len(doc.paragraphs)}")
-            logger.debug(f"Number of non-empty paragraphs: {len(text_parts)}")
+            logger.debug("Number of paragraphs: %d", len(paragraphs))
+            logger.debug("Number of non-empty paragraphs: %d", len(text_parts))
             
             return extracted_text
             
         except Exception as e:
-            logger.error(f"Error extracting text from DOCX: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            logger.error(f"Error traceback: {traceback.format_exc()}")
+            logger.exception("Error extracting text from DOCX: %s", e)
             raise DocxServiceError(f"Error extracting text from document: {str(e)}") 
\ No newline at end of file
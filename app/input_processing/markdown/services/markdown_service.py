@@ -1,10 +1,15 @@
 import logging
-import traceback
+import re
+from collections import Counter
 from typing import Optional
+from app.input_processing.core.services.encoding_core_service import decode_text
 
 # Set up module logger
 logger = logging.getLogger(__name__)
 
+# Marker at the start of a line for a header, list item or code fence
+_ELEMENT_MARKER_RE = re.compile(r'^[ \t]*(#|[-*+]|```)', re.MULTILINE)
+
 class MarkdownServiceError(Exception):
     """
     Exception for Markdown service errors
@@ -32,43 +37,30 @@ class MarkdownService:
         try:
             # Log start of processing
             logger.info("Starting Markdown text extraction")
-            logger.debug(f"File content size: {len(file_content)} bytes")
-            
-            # Try different encodings in order of preference
-            encodings = ['utf-8', 'utf-8-sig', 'latin-1']
-            content = None
-            
-            for encoding in encodings:
-                try:
-                    content = file_content.decode(encoding)
-                    logger.debug(f"Successfully decoded file content as {encoding}")
-                    break
-                except UnicodeDecodeError as e:
-                    logger.warning(f"{encoding} decode failed: {str(e)}")
-                    continue
-            
-            if content is None:
-                raise MarkdownServiceError("Failed to decode file content with any supported encoding")
-            
-            # Log content statistics
-            lines = content.split('\n')
-            logger.debug(f"Found {len(lines)} lines in markdown content")
+            logger.debug("File content size: %d bytes", len(file_content))
             
-            # Count markdown elements
-            headers = sum(1 for line in lines if line.strip().startswith('#'))
-            lists = sum(1 for line in lines if line.strip().startswith(('-', '*', '+')))
-            code_blocks = sum(1 for line in lines if line.strip().startswith('```'))
+            # Decode as UTF-8, falling back to latin-1 for other content
+            content, encoding = decode_text(file_content)
+            logger.debug("Successfully decoded file content as %s", encoding)
             
-            logger.debug(f"Markdown elements found: {headers} headers, {lists} lists, {code_blocks} code blocks")
+            # Log content statistics; counting walks every line, so only when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Found %d lines in markdown content", content.count('\n') + 1)
+                
+                # Count markdown elements in a single scan
+                markers = Counter(match.group(1) for match in _ELEMENT_MARKER_RE.finditer(content))
+                headers = markers['#']
+                lists = markers['-'] + markers['*'] + markers['+']
+                code_blocks = markers['```']
+                
+                logger.debug("Markdown elements found: %d headers, %d lists, %d code blocks", headers, lists, code_blocks)
             
             # Clean up content
             cleaned_text = content.strip()
-            logger.info(f"Successfully extracted {len(cleaned_text)} characters from markdown content")
+            logger.info("Successfully extracted %d characters from markdown content", len(cleaned_text))
             
             return cleaned_text
             
         except Exception as e:
-            logger.error(f"Error extracting text from Markdown: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            logger.error(f"Error traceback: {traceback.format_exc()}")
+            logger.exception("Error extracting text from Markdown: %s", e)
             raise MarkdownServiceError(f"Error extracting text from markdown: {str(e)}")
\ No newline at end of file
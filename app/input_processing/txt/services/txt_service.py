@@ -1,6 +1,6 @@
 import logging
-import traceback
 from typing import Optional
+from app.input_processing.core.services.encoding_core_service import decode_text
 
 # Set up module logger
 logger = logging.getLogger(__name__)
@@ -28,36 +28,22 @@ class TxtService:
         try:
             # Log start of processing
             logger.info("Starting text file extraction")
-            logger.debug(f"File content size: {len(file_content)} bytes")
+            logger.debug("File content size: %d bytes", len(file_content))
             
-            # Try different encodings in order of preference
-            encodings = ['utf-8', 'utf-8-sig', 'latin-1']
-            content = None
+            # Decode as UTF-8, falling back to latin-1 for other content
+            content, encoding = decode_text(file_content)
+            logger.debug("Successfully decoded file content as %s", encoding)
             
-            for encoding in encodings:
-                try:
-                    content = file_content.decode(encoding)
-                    logger.debug(f"Successfully decoded file content as {encoding}")
-                    break
-                except UnicodeDecodeError as e:
-                    logger.warning(f"{encoding} decode failed: {str(e)}")
-                    continue
-            
-            if content is None:
-                raise TxtServiceError("Failed to decode file content with any supported encoding")
-            
-            # Log content statistics
-            lines = content.split('\n')
-            logger.debug(f"Found {len(lines)} lines in text content")
+            # Log content statistics; splitting copies the content, so only when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Found %d lines in text content", content.count('\n') + 1)
             
             # Clean up content
             cleaned_text = content.strip()
-            logger.info(f"Successfully extracted {len(cleaned_text)} characters from text content")
+            logger.info("Successfully extracted %d characters from text content", len(cleaned_text))
             
             return cleaned_text
             
         except Exception as e:
-            logger.error(f"Error extracting text from file: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            logger.error(f"Error traceback: {traceback.format_exc()}")
+            logger.exception("Error extracting text from file: %s", e)
             raise TxtServiceError(f"Error extracting text from file: {str(e)}") 
\ No newline at end of file
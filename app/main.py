@@ -1,8 +1,11 @@
 from fastapi import FastAPI, Request
-from app.ai.customer_intent.routers.ai_customer_intent_router import router as customer_intent_router
-from app.ai.content_types.routers.content_type_router import router as content_type_router
-from app.ai.content_generate.routers.content_generate_router import router as content_generate_router
+from fastapi.responses import ORJSONResponse
+from app.ai.customer_intent.routers import ai_customer_intent_router
+from app.ai.content_types.routers import content_type_router
+from app.ai.content_generate.routers import content_generate_router
+from app.ai.core.services.ai_core_service import close_shared_ai_service
 from app.shared.logging import setup_app_logging, LoggingMiddleware, app_logger
+from contextlib import asynccontextmanager
 import os
 import datetime
 
@@ -10,10 +13,29 @@ import datetime
 logger = setup_app_logging()
 logger.info("Starting AI Content Developer API")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prepare shared services before the first request and release them on shutdown
+    """
+    # Load tokenizer encodings now instead of on the first request
+    for router_module in (ai_customer_intent_router, content_type_router, content_generate_router):
+        try:
+            router_module.tokenizer_service.warm_up()
+        except Exception as e:
+            logger.warning("Tokenizer warmup failed: %s", e)
+    
+    yield
+    
+    # Every router shares one AI service, so its connection pool is closed once
+    await close_shared_ai_service()
+
 app = FastAPI(
     title="AI Content Developer API",
     description="API application for generating AI content",
-    version="0.4.0"
+    version="0.4.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add logging middleware
@@ -24,19 +46,19 @@ API_V1_PREFIX = "/api/v1"
 
 # Include the Customer Intent router with proper prefix
 app.include_router(
-    customer_intent_router,
+    ai_customer_intent_router.router,
     prefix=API_V1_PREFIX
 )
 
 # Include the Content Type router with proper prefix
 app.include_router(
-    content_type_router,
+    content_type_router.router,
     prefix=API_V1_PREFIX
 )
 
 # Include the Content Generate router with proper prefix
 app.include_router(
-    content_generate_router,
+    content_generate_router.router,
     prefix=API_V1_PREFIX
 )
 
@@ -0,0 +1,3 @@
+from .lru_cache import LRUCache, content_key
+from .micro_batcher import MicroBatcher
+from .singleflight import SingleFlight
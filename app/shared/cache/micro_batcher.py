@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+class MicroBatcher:
+    """
+    Collects items submitted within a short window and processes them together
+    
+    The first item submitted opens a window of max_wait seconds; every item
+    submitted before it closes, up to max_batch_size, is handed to
+    process_batch in a single call. Each caller receives the result at its
+    own position in the returned list.
+    """
+    
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_wait: float = 0.02,
+        max_batch_size: int = 8
+    ):
+        """
+        Initialize the batcher
+        
+        Args:
+            process_batch: Coroutine function taking a list of items and returning
+                one result per item; a result that is an exception is raised to
+                the caller that submitted the item
+            max_wait: Number of seconds to wait for more items after the first
+            max_batch_size: Maximum number of items processed together
+        """
+        self._process_batch = process_batch
+        self._max_wait = max_wait
+        self._max_batch_size = max_batch_size
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Running batches, referenced so they are not garbage collected mid-flight
+        self._batches: Set[asyncio.Task] = set()
+    
+    async def submit(self, item: Any) -> Any:
+        """
+        Add an item to the current batch and wait for its result
+        
+        Args:
+            item: Item to process
+        
+        Returns:
+            The result for the item
+        
+        Raises:
+            Exception: Whatever processing the item or its batch raised
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        """Start processing the items collected so far"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+    
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Process a batch and hand each result to the caller waiting for it"""
+        try:
+            results = await self._process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Expected {len(batch)} batch results, got {len(results)}")
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        for (_, future), result in zip(batch, results):
+            # Callers that were cancelled while waiting no longer need a result
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution
+    
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same result instead of repeating the work.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for key, or join the call already in flight for key
+        
+        Args:
+            key: Key identifying identical calls
+            func: Zero-argument coroutine function doing the work
+            
+        Returns:
+            The result of the shared call
+            
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        
+        # Shield so one caller being cancelled does not cancel the shared call
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Remove a finished call so later callers start a fresh one"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -1,8 +1,11 @@
+import atexit
 import logging
+import queue
 import sys
 import os
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Dict, Optional
 
 # Default log format
 DEFAULT_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -31,6 +34,48 @@ class Logger:
         'backup_count': 3
     }
     
+    # Queues drained by background listener threads, one per output target, so
+    # writing log output never blocks the thread that logged the message
+    _queues: Dict[str, queue.SimpleQueue] = {}
+    _listeners: Dict[str, QueueListener] = {}
+    _queues_lock = threading.Lock()
+    
+    @classmethod
+    def _get_log_queue(cls, target: str, handler_factory: Callable[[], logging.Handler]) -> queue.SimpleQueue:
+        """
+        Get the queue for an output target, starting its listener on first use
+        
+        Records are formatted by the logger's own QueueHandler before they are
+        queued, so the target handler only writes the finished message.
+        
+        Args:
+            target: Key identifying the output target
+            handler_factory: Creates the handler that writes to the target
+            
+        Returns:
+            Queue feeding the target's listener
+        """
+        with cls._queues_lock:
+            log_queue = cls._queues.get(target)
+            if log_queue is None:
+                handler = handler_factory()
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                log_queue = queue.SimpleQueue()
+                listener = QueueListener(log_queue, handler)
+                listener.start()
+                cls._queues[target] = log_queue
+                cls._listeners[target] = listener
+            return log_queue
+    
+    @classmethod
+    def stop_listeners(cls):
+        """Flush queued records and stop the background listener threads"""
+        with cls._queues_lock:
+            for listener in cls._listeners.values():
+                listener.stop()
+            cls._listeners.clear()
+            cls._queues.clear()
+    
     @classmethod
     def configure_global_settings(cls, 
                                 log_to_file: bool = False,
@@ -108,7 +153,9 @@ class Logger:
         
         # Console handler
         if log_to_console:
-            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler = QueueHandler(
+                Logger._get_log_queue("console", lambda: logging.StreamHandler(sys.stdout))
+            )
             console_handler.setFormatter(formatter)
             logger.addHandler(console_handler)
         
@@ -119,10 +166,15 @@ class Logger:
                 os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
                 
                 # Create rotating file handler
-                file_handler = RotatingFileHandler(
-                    log_file_path,
-                    maxBytes=max_log_file_size,
-                    backupCount=backup_count
+                file_handler = QueueHandler(
+                    Logger._get_log_queue(
+                        f"file:{log_file_path}",
+                        lambda: RotatingFileHandler(
+                            log_file_path,
+                            maxBytes=max_log_file_size,
+                            backupCount=backup_count
+                        )
+                    )
                 )
                 file_handler.setFormatter(formatter)
                 logger.addHandler(file_handler)
@@ -164,5 +216,8 @@ class Logger:
         # This will use the globally configured file logging settings
         return cls.setup_logger(f"request.{request_id}", log_format=request_format)
 
+# Write out any queued records when the process exits
+atexit.register(Logger.stop_listeners)
+
 # Default application logger
 app_logger = Logger.get_logger("ai_content_developer") 
\ No newline at end of file
@@ -26,6 +26,25 @@ def mock_env_vars():
     os.environ["OPENAI_ORGANIZATION"] = "test-org"
     
 
+# Reset module-level caches so results do not leak between tests
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Clear router caches before each test"""
+    from app.ai.content_generate.routers import content_generate_router
+    from app.ai.content_types.routers import content_type_router
+    from app.ai.core.services import tokenizer_core_service
+    from app.ai.customer_intent.routers import ai_customer_intent_router
+    from app.config import settings as settings_module
+    content_generate_router.token_info_cache.clear()
+    content_generate_router.content_generate_service.clear_cache()
+    content_type_router.content_type_service.clear_cache()
+    tokenizer_core_service._load_encoding.cache_clear()
+    tokenizer_core_service._token_count_cache.clear()
+    ai_customer_intent_router.intent_result_cache.clear()
+    settings_module._get_encoding.cache_clear()
+    yield
+    
+
 # OpenAI Settings fixture
 @pytest.fixture
 def openai_settings():
@@ -194,6 +213,7 @@ def mock_docx_upload():
             self.filename = "test.docx"
             self.content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
             self._file = io.BytesIO(file_content)
+            self.file = self._file
         
         async def read(self):
             return self._file.getvalue()
@@ -1,3 +1,4 @@
+import hashlib
 import pytest
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
@@ -68,7 +69,8 @@ class TestContentGenerateEndpoint:
         assert "token_limit" in data
         assert "token_count" in data
         assert "remaining_tokens" in data
-        assert data["text_used"] == request_data["text_used"]
+        assert data["text_used"] is None
+        assert data["text_used_sha256"] == hashlib.sha256(request_data["text_used"].encode("utf-8")).hexdigest()
     
     @patch("app.ai.content_generate.routers.content_generate_router.ai_service")
     @patch("app.ai.content_generate.routers.content_generate_router.tokenizer_service")
@@ -130,6 +132,36 @@ class TestContentGenerateEndpoint:
         assert data["generated_content"][1]["title"] == "How to Use FastAPI"  # Extracted from content
         assert data["generated_content"][1]["content"] == "# How to Use FastAPI\n\nSteps to create REST APIs."
     
+    @patch("app.ai.content_generate.routers.content_generate_router.ai_service")
+    @patch("app.ai.content_generate.routers.content_generate_router.tokenizer_service")
+    def test_generate_content_echo_text(self, mock_tokenizer_service, mock_ai_service):
+        """Test that the full text used is returned when echo is requested"""
+        # Mock services
+        mock_tokenizer_service.validate_tokens.return_value = {
+            "model": "gpt-4",
+            "model_limit": 4000,
+            "token_count": 1000,
+            "tokens_remaining": 3000,
+            "percentage_used": 25
+        }
+        mock_ai_service.generate_completion = AsyncMock(return_value={"text": "# Generated Tutorial\n\nBody."})
+        
+        # Request data
+        request_data = {
+            "intent": "As a developer, I want to create a REST API because it will help me serve data to clients.",
+            "text_used": "This is sample text about REST APIs and how to build them with FastAPI.",
+            "content_types": [{"type": "tutorial", "title": None}]
+        }
+        
+        # Make request with echo enabled
+        response = client.post("/api/v1/content-generate?echo=1", json=request_data)
+        
+        # Verify the text is echoed alongside its digest
+        assert response.status_code == 200
+        data = response.json()
+        assert data["text_used"] == request_data["text_used"]
+        assert data["text_used_sha256"] == hashlib.sha256(request_data["text_used"].encode("utf-8")).hexdigest()
+    
     def test_generate_content_invalid_request(self):
         """Test error handling with invalid request data"""
         # Missing required fields
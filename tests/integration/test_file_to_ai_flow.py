@@ -44,7 +44,7 @@ class TestFileToAIFlow:
         # Mock the extraction services at the module level
         with patch("app.ai.customer_intent.routers.ai_customer_intent_router.file_handler_routing_service.validate_file_type", 
                   return_value="docx"), \
-             patch("app.ai.customer_intent.routers.ai_customer_intent_router.docx_service.extract_text", 
+             patch("app.ai.customer_intent.routers.ai_customer_intent_router.docx_service.extract_text_from_stream", 
                    return_value="Extracted docx content"):
             
             # Run the function
@@ -100,7 +100,7 @@ class TestFileToAIFlow:
             "encoding": "cl100k_base"
         }
         
-        with patch.object(tokenizer_service, 'validate_tokens', return_value=expected_result):
+        with patch("app.ai.customer_intent.routers.ai_customer_intent_router.tokenizer_service.validate_tokens", return_value=expected_result):
             # Run the function
             result = validate_token_count(processed_text)
             
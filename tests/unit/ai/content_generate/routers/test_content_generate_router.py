@@ -1,3 +1,5 @@
+import asyncio
+import json
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi import HTTPException
@@ -5,7 +7,9 @@ from app.ai.content_generate.routers.content_generate_router import (
     validate_token_count,
     generate_content_for_type,
     generate_all_content,
+    stream_all_content,
     format_response,
+    request_logger,
     ContentGenerateRouterError
 )
 from app.ai.content_generate.models.content_generate_model import (
@@ -15,6 +19,7 @@ from app.ai.content_generate.models.content_generate_model import (
     ContentGenerateResponse
 )
 from app.ai.core.services.tokenizer_core_service import TokenizerError
+from app.ai.core.services.ai_core_service import OpenAIServiceError
 
 class TestContentGenerateRouter:
     """Unit tests for the content generate router functions"""
@@ -51,6 +56,47 @@ class TestContentGenerateRouter:
         # Verify error message
         assert "Tokenizer error: Token limit exceeded" in str(excinfo.value)
     
+    @patch("app.ai.content_generate.routers.content_generate_router.tokenizer_service")
+    def test_validate_token_count_cached(self, mock_tokenizer_service):
+        """Test that repeated validation of the same text reuses the cached token info"""
+        # Setup mock
+        mock_token_info = {
+            "token_count": 1000,
+            "model_limit": 4000,
+            "percentage_used": 25,
+            "tokens_remaining": 3000
+        }
+        mock_tokenizer_service.validate_tokens.return_value = mock_token_info
+        
+        # Call function twice with the same text and once with different text
+        first = validate_token_count("Repeated text")
+        second = validate_token_count("Repeated text")
+        validate_token_count("Other text")
+        
+        # Verify the tokenizer only ran once per distinct text
+        assert first == second == mock_token_info
+        assert mock_tokenizer_service.validate_tokens.call_count == 2
+    
+    @patch("app.ai.content_generate.routers.content_generate_router.tokenizer_service")
+    def test_validate_token_count_uses_request_logger(self, mock_tokenizer_service):
+        """Test that helpers log through the logger set for the current request"""
+        # Setup mock
+        mock_tokenizer_service.validate_tokens.return_value = {
+            "token_count": 100,
+            "model_limit": 8000,
+            "percentage_used": 1.25
+        }
+        mock_logger = MagicMock()
+        token = request_logger.set(mock_logger)
+        
+        try:
+            validate_token_count("Logged text")
+        finally:
+            request_logger.reset(token)
+        
+        # Verify the message is formatted lazily by the logger
+        mock_logger.info.assert_called_once_with("Token count: %s/%s (%s%%)", 100, 8000, 1.25)
+    
     @patch("app.ai.content_generate.routers.content_generate_router.content_generate_service")
     @patch("app.ai.content_generate.routers.content_generate_router.ai_service")
     @pytest.mark.asyncio
@@ -59,6 +105,7 @@ class TestContentGenerateRouter:
         # Setup mocks
         mock_prompt = {"messages": [{"role": "system", "content": "test"}, {"role": "user", "content": "test"}]}
         mock_content_generate_service.format_content_generate_prompt.return_value = mock_prompt
+        mock_content_generate_service.get_cached_or_none.return_value = None
         
         mock_completion = {"text": "# Generated Content\n\nThis is a test content."}
         mock_ai_service.generate_completion = AsyncMock(return_value=mock_completion)
@@ -89,6 +136,7 @@ class TestContentGenerateRouter:
         # Setup mocks
         mock_prompt = {"messages": [{"role": "system", "content": "test"}, {"role": "user", "content": "test"}]}
         mock_content_generate_service.format_content_generate_prompt.return_value = mock_prompt
+        mock_content_generate_service.get_cached_or_none.return_value = None
         
         # Empty response
         mock_completion = {"text": ""}
@@ -106,6 +154,91 @@ class TestContentGenerateRouter:
         # Verify error message
         assert "Empty response from LLM" in str(excinfo.value)
     
+    @patch("app.ai.content_generate.routers.content_generate_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_generate_content_for_type_uses_cache(self, mock_ai_service):
+        """Test that identical generation inputs are served from the cache"""
+        # Setup mock
+        mock_completion = {"text": "# Cached Content\n\nThis is cached content."}
+        mock_ai_service.generate_completion = AsyncMock(return_value=mock_completion)
+        
+        # Call function twice with identical inputs
+        first = await generate_content_for_type(
+            content_type="tutorial",
+            title="Cached Title",
+            intent="Cached intent",
+            text="Cached text"
+        )
+        second = await generate_content_for_type(
+            content_type="tutorial",
+            title="Cached Title",
+            intent="Cached intent",
+            text="Cached text"
+        )
+        
+        # Verify the LLM was only called once
+        assert first == second == mock_completion["text"]
+        mock_ai_service.generate_completion.assert_called_once()
+    
+    @patch("app.ai.content_generate.routers.content_generate_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_generate_content_for_type_coalesces_identical_calls(self, mock_ai_service):
+        """Test that identical concurrent generations share a single LLM call"""
+        # Setup mock
+        async def slow_completion(messages):
+            await asyncio.sleep(0.01)
+            return {"text": "# Shared Content\n\nBody"}
+        
+        mock_ai_service.generate_completion = AsyncMock(side_effect=slow_completion)
+        
+        # Call function concurrently with identical inputs
+        results = await asyncio.gather(*(
+            generate_content_for_type(
+                content_type="tutorial",
+                title=None,
+                intent="Shared intent",
+                text="Shared text"
+            )
+            for _ in range(3)
+        ))
+        
+        # Verify the LLM was only called once
+        assert results == ["# Shared Content\n\nBody"] * 3
+        mock_ai_service.generate_completion.assert_called_once()
+    
+    @patch("app.ai.content_generate.routers.content_generate_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_generate_content_for_type_limits_concurrency(self, mock_ai_service):
+        """Test that concurrent LLM calls are bounded by the semaphore"""
+        # Track how many LLM calls are in flight at once
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def slow_completion(messages):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"text": "# Content\n\nBody"}
+        
+        mock_ai_service.generate_completion = slow_completion
+        
+        # Allow only two concurrent calls
+        with patch("app.ai.content_generate.routers.content_generate_router.llm_semaphore", asyncio.Semaphore(2)):
+            await asyncio.gather(*(
+                generate_content_for_type(
+                    content_type="tutorial",
+                    title=None,
+                    intent="Test intent",
+                    text=f"Test text {i}"
+                )
+                for i in range(5)
+            ))
+        
+        # Verify the limit was respected
+        assert max_in_flight == 2
+    
     @patch("app.ai.content_generate.routers.content_generate_router.generate_content_for_type")
     @pytest.mark.asyncio
     async def test_generate_all_content_success(self, mock_generate_content_for_type):
@@ -171,6 +304,33 @@ class TestContentGenerateRouter:
         assert result[0].title == "Test Tutorial"
         assert result[0].content == "# Tutorial Content\n\nThis is tutorial content."
     
+    @patch("app.ai.content_generate.routers.content_generate_router.generate_content_for_type")
+    @pytest.mark.asyncio
+    async def test_generate_all_content_cancelled_type(self, mock_generate_content_for_type):
+        """Test that a cancelled content type is skipped without failing the others"""
+        # Setup mock - first call is cancelled, second call succeeds
+        mock_generate_content_for_type.side_effect = [
+            asyncio.CancelledError(),
+            "# How-To Guide\n\nThis is how-to content."
+        ]
+        
+        # Test request data
+        request = ContentGenerateRequest(
+            intent="Test intent",
+            text_used="Test text",
+            content_types=[
+                ContentTypeRequest(type="tutorial", title="Test Tutorial"),
+                ContentTypeRequest(type="how-to", title=None)
+            ]
+        )
+        
+        # Call function
+        result = await generate_all_content(request, {"model": "gpt-4"})
+        
+        # Verify only the successful content is returned
+        assert len(result) == 1
+        assert result[0].type == "how-to"
+    
     @patch("app.ai.content_generate.routers.content_generate_router.generate_content_for_type")
     @pytest.mark.asyncio
     async def test_generate_all_content_all_fail(self, mock_generate_content_for_type):
@@ -197,6 +357,108 @@ class TestContentGenerateRouter:
         # Verify error message
         assert "Failed to generate content for all requested types" in str(excinfo.value)
     
+    @patch("app.ai.content_generate.routers.content_generate_router.generate_content_for_type")
+    @pytest.mark.asyncio
+    async def test_generate_all_content_runs_concurrently(self, mock_generate_content_for_type):
+        """Test that content types are generated concurrently rather than one after another"""
+        # Track how many generations are in flight at once
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def slow_generate(content_type, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return f"# {content_type} Content\n\nBody."
+        
+        mock_generate_content_for_type.side_effect = slow_generate
+        
+        # Test request data
+        request = ContentGenerateRequest(
+            intent="Test intent",
+            text_used="Test text",
+            content_types=[
+                ContentTypeRequest(type="tutorial", title=None),
+                ContentTypeRequest(type="how-to", title=None),
+                ContentTypeRequest(type="reference", title=None)
+            ]
+        )
+        
+        # Call function
+        result = await generate_all_content(request, {"model": "gpt-4"})
+        
+        # Verify all generations overlapped and ordering follows the request
+        assert max_in_flight == 3
+        assert [item.type for item in result] == ["tutorial", "how-to", "reference"]
+        assert result[2].title == "reference Content"
+    
+    @patch("app.ai.content_generate.routers.content_generate_router.generate_content_for_type")
+    @pytest.mark.asyncio
+    async def test_generate_all_content_title_extraction(self, mock_generate_content_for_type):
+        """Test that the first h1 header is used as the title, ignoring deeper headers"""
+        # Setup mock - first content has a sub header before its h1, second has no h1
+        mock_generate_content_for_type.side_effect = [
+            "Intro line\n## Section\n# Real Title\n# Second Title\nBody",
+            "## Only a section\nBody"
+        ]
+        
+        # Test request data
+        request = ContentGenerateRequest(
+            intent="Test intent",
+            text_used="Test text",
+            content_types=[
+                ContentTypeRequest(type="tutorial", title=None),
+                ContentTypeRequest(type="how-to", title=None)
+            ]
+        )
+        
+        # Call function
+        result = await generate_all_content(request, {"model": "gpt-4"})
+        
+        # Verify titles
+        assert result[0].title == "Real Title"
+        assert result[1].title == "Untitled"
+    
+    @patch("app.ai.content_generate.routers.content_generate_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_stream_all_content(self, mock_ai_service):
+        """Test streaming content for multiple types as JSON lines"""
+        # Setup mock - tutorial streams in pieces, how-to fails
+        async def fake_stream(messages):
+            if "Tutorial" in messages[0]["content"]:
+                for piece in ["# Tutorial", " Content\n", "Body"]:
+                    yield piece
+            else:
+                raise OpenAIServiceError("API error")
+                yield  # pragma: no cover
+        
+        mock_ai_service.generate_completion_stream = fake_stream
+        
+        # Test request data
+        request = ContentGenerateRequest(
+            intent="Test intent",
+            text_used="Test text",
+            content_types=[
+                ContentTypeRequest(type="tutorial", title=None),
+                ContentTypeRequest(type="how-to", title=None)
+            ]
+        )
+        
+        # Collect the streamed events
+        events = [json.loads(line) async for line in stream_all_content(request)]
+        
+        # Verify the tutorial deltas reassemble into the full content
+        tutorial_text = "".join(event.get("delta", "") for event in events if event["type"] == "tutorial")
+        assert tutorial_text == "# Tutorial Content\nBody"
+        assert {"type": "tutorial", "done": True} in events
+        
+        # Verify the failure was reported for the how-to type only
+        how_to_errors = [event for event in events if event["type"] == "how-to" and "error" in event]
+        assert len(how_to_errors) == 1
+        assert "API error" in how_to_errors[0]["error"]
+    
     def test_format_response_valid_data(self):
         """Test format_response with valid data"""
         # Test data
@@ -0,0 +1,60 @@
+import pytest
+from pydantic import ValidationError
+
+from app.ai.content_types.models.content_type_model import ContentTypeReply, ContentTypeRequest, ContentTypeSelection
+
+
+class TestContentTypeReply:
+    """Tests for the ContentTypeReply model"""
+
+    def test_decode_reply(self):
+        """Test decoding an LLM reply straight into selections"""
+        reply = ContentTypeReply.model_validate_json(
+            '{"content_types": [{"type": "tutorial", "confidence": "85", "reasoning": "Learning"}]}'
+        )
+        
+        selection = reply.content_types[0]
+        assert isinstance(selection, ContentTypeSelection)
+        assert selection.type == "tutorial"
+        assert selection.confidence == 85.0
+        assert selection.reasoning == "Learning"
+
+    def test_missing_fields_use_defaults(self):
+        """Test that entries missing fields fall back to defaults"""
+        reply = ContentTypeReply.model_validate_json('{"content_types": [{"type": "reference"}]}')
+        
+        assert reply.content_types[0].confidence == 0
+        assert reply.content_types[0].reasoning == ""
+
+    @pytest.mark.parametrize("content", [
+        "not json",
+        "[]",
+        '{"other": []}'
+    ])
+    def test_invalid_reply(self, content):
+        """Test that malformed replies are rejected"""
+        with pytest.raises(ValidationError):
+            ContentTypeReply.model_validate_json(content)
+
+
+class TestContentTypeRequest:
+    """Tests for the ContentTypeRequest model"""
+
+    def test_strips_whitespace(self):
+        """Test that surrounding whitespace is stripped from the inputs"""
+        request = ContentTypeRequest(intent="  Test intent\n", text_used="\nTest text  ")
+        
+        assert request.intent == "Test intent"
+        assert request.text_used == "Test text"
+
+    def test_rejects_unknown_fields(self):
+        """Test that unexpected fields are rejected"""
+        with pytest.raises(ValidationError):
+            ContentTypeRequest(intent="Test intent", text_used="Test text", extra="value")
+
+    def test_is_immutable(self):
+        """Test that a validated request cannot be modified"""
+        request = ContentTypeRequest(intent="Test intent", text_used="Test text")
+        
+        with pytest.raises(ValidationError):
+            request.intent = "Other intent"
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from app.ai.content_types.routers.content_type_router import (
+    _complete_selection_batch,
+    select_content_types,
+    stream_content_types,
+    ContentTypeRouterError
+)
+
+
+async def _stream(pieces):
+    """Yield reply pieces like AIService.generate_completion_stream"""
+    for piece in pieces:
+        yield piece
+
+
+class TestContentTypeRouter:
+    """Unit tests for the content type router functions"""
+
+    @patch("app.ai.content_types.routers.content_type_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_stream_content_types(self, mock_ai_service):
+        """Test that selections are streamed as JSON lines followed by done"""
+        # Setup mock reply split across pieces
+        mock_ai_service.generate_completion_stream.return_value = _stream([
+            '{"content_types": [{"type": "tutorial", "confid',
+            'ence": 85, "reasoning": "Learning"}, {"type": "how-to", ',
+            '"confidence": 60, "reasoning": "Tasks"}]}'
+        ])
+        
+        lines = [json.loads(line) async for line in stream_content_types("Test intent", "Test text")]
+        
+        assert lines == [
+            {"type": "tutorial", "confidence": 85, "reasoning": "Learning"},
+            {"type": "how-to", "confidence": 60, "reasoning": "Tasks"},
+            {"done": True}
+        ]
+
+    @patch("app.ai.content_types.routers.content_type_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_stream_content_types_incomplete_reply(self, mock_ai_service):
+        """Test that a reply cut off before the list ends produces an error line"""
+        mock_ai_service.generate_completion_stream.return_value = _stream([
+            '{"content_types": [{"type": "tutorial", "confidence": 85, "reasoning": "Learning"}'
+        ])
+        
+        lines = [json.loads(line) async for line in stream_content_types("Test intent", "Test text")]
+        
+        assert lines[0]["type"] == "tutorial"
+        assert "error" in lines[-1]
+
+    @pytest.mark.asyncio
+    async def test_select_content_types(self):
+        """Test that the LLM reply is decoded into the response"""
+        # Setup mock
+        mock_ai_service = MagicMock()
+        mock_ai_service.generate_completion = AsyncMock(return_value={
+            "text": '{"content_types": [{"type": "tutorial", "confidence": 85, "reasoning": "Learning"}]}',
+            "model": "gpt-4",
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+        })
+        token_info = {"model_family": "gpt", "model_limit": 8000, "token_count": 100, "tokens_remaining": 7900}
+        
+        response = await select_content_types(
+            intent="Test intent",
+            text_used="Test text",
+            ai_service=mock_ai_service,
+            token_service=MagicMock(),
+            token_info=token_info,
+            logger=MagicMock()
+        )
+        
+        assert response.selected_types[0].type == "tutorial"
+        assert response.selected_types[0].confidence == 85
+        assert response.model == "gpt-4"
+        assert response.token_limit == 8000
+        assert response.remaining_tokens == 7900
+
+    @pytest.mark.asyncio
+    async def test_select_content_types_cached_uses_own_token_info(self):
+        """Test that a cached selection is reported with the caller's token information"""
+        mock_ai_service = MagicMock()
+        mock_ai_service.generate_completion = AsyncMock(return_value={
+            "text": '{"content_types": [{"type": "tutorial", "confidence": 85, "reasoning": "Learning"}]}',
+            "model": "gpt-4",
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+        })
+        
+        async def select(text_used, token_info):
+            return await select_content_types(
+                intent="Test intent",
+                text_used=text_used,
+                ai_service=mock_ai_service,
+                token_service=MagicMock(),
+                token_info=token_info,
+                logger=MagicMock()
+            )
+        
+        await select("Test text", {"model_limit": 8000, "token_count": 100, "tokens_remaining": 7900})
+        # Differs only in formatting, so it shares the cache entry
+        response = await select("Test  TEXT", {"model_limit": 8000, "token_count": 102, "tokens_remaining": 7898})
+        
+        mock_ai_service.generate_completion.assert_called_once()
+        assert response.selected_types[0].type == "tutorial"
+        assert response.model == "gpt-4"
+        assert response.token_count == 102
+        assert response.remaining_tokens == 7898
+        assert response.usage == {}
+
+    @pytest.mark.asyncio
+    async def test_select_content_types_invalid_reply(self):
+        """Test that a reply that is not valid JSON raises a router error"""
+        mock_ai_service = MagicMock()
+        mock_ai_service.generate_completion = AsyncMock(return_value={"text": "not json"})
+        
+        with pytest.raises(ContentTypeRouterError) as excinfo:
+            await select_content_types(
+                intent="Test intent",
+                text_used="Test text",
+                ai_service=mock_ai_service,
+                token_service=MagicMock(),
+                token_info={},
+                logger=MagicMock()
+            )
+        
+        assert "Error parsing LLM response" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_select_content_types_coalesces_identical_calls(self):
+        """Test that identical concurrent selections share a single LLM call"""
+        async def slow_completion(**kwargs):
+            await asyncio.sleep(0.01)
+            return {
+                "text": '{"content_types": [{"type": "reference", "confidence": 70, "reasoning": "Lookup"}]}',
+                "model": "gpt-4",
+                "usage": {}
+            }
+        
+        mock_ai_service = MagicMock()
+        mock_ai_service.generate_completion = AsyncMock(side_effect=slow_completion)
+        
+        # Texts differ only in formatting, so they share the call but not token counts
+        responses = await asyncio.gather(*(
+            select_content_types(
+                intent="Shared intent",
+                text_used=text_used,
+                ai_service=mock_ai_service,
+                token_service=MagicMock(),
+                token_info={"token_count": token_count},
+                logger=MagicMock()
+            )
+            for text_used, token_count in [("Shared text", 10), ("Shared  text", 11), ("shared text", 12)]
+        ))
+        
+        assert all(response.selected_types == responses[0].selected_types for response in responses)
+        assert [response.token_count for response in responses] == [10, 11, 12]
+        mock_ai_service.generate_completion.assert_called_once()
+
+    @patch("app.ai.content_types.routers.content_type_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_complete_selection_batch(self, mock_ai_service):
+        """Test that a batch is answered by one call and split per request"""
+        mock_ai_service.generate_completion = AsyncMock(return_value={
+            "text": (
+                '{"results": ['
+                '{"id": 1, "content_types": [{"type": "how-to", "confidence": 60, "reasoning": "Tasks"}]}, '
+                '{"id": 0, "content_types": [{"type": "tutorial", "confidence": 85, "reasoning": "Learning"}]}'
+                ']}'
+            ),
+            "model": "gpt-4",
+            "usage": {}
+        })
+        
+        results = await _complete_selection_batch([("Intent one", "Text one"), ("Intent two", "Text two")])
+        
+        assert [reply.content_types[0].type for reply, _ in results] == ["tutorial", "how-to"]
+        assert all(completion["model"] == "gpt-4" for _, completion in results)
+        mock_ai_service.generate_completion.assert_called_once()
+
+    @patch("app.ai.content_types.routers.content_type_router.ai_service")
+    @pytest.mark.asyncio
+    async def test_complete_selection_batch_retries_missing_results(self, mock_ai_service):
+        """Test that requests missing from the batched reply are selected individually"""
+        mock_ai_service.generate_completion = AsyncMock(side_effect=[
+            {
+                "text": '{"results": [{"id": 0, "content_types": [{"type": "tutorial", "confidence": 85, "reasoning": "Learning"}]}]}',
+                "model": "gpt-4",
+                "usage": {}
+            },
+            {
+                "text": '{"content_types": [{"type": "reference", "confidence": 70, "reasoning": "Lookup"}]}',
+                "model": "gpt-4",
+                "usage": {}
+            }
+        ])
+        
+        results = await _complete_selection_batch([("Intent one", "Text one"), ("Intent two", "Text two")])
+        
+        assert [reply.content_types[0].type for reply, _ in results] == ["tutorial", "reference"]
+        assert mock_ai_service.generate_completion.call_count == 2
@@ -0,0 +1,138 @@
+import json
+import pytest
+
+from app.ai.content_types.models.content_type_model import ContentTypeSelection
+from app.ai.content_types.services.content_type_service import ContentTypeService, ContentTypeStreamParser
+
+
+@pytest.fixture
+def service():
+    """Return a ContentTypeService instance"""
+    return ContentTypeService()
+
+
+@pytest.fixture
+def selected_types():
+    """Return content type selections"""
+    return [
+        ContentTypeSelection(type="tutorial", confidence=85, reasoning="Learning oriented")
+    ]
+
+
+class TestContentTypeService:
+    """Tests for the ContentTypeService class"""
+
+    def test_get_cached_or_none_missing(self, service):
+        """Test that an unseen intent and text is not cached"""
+        key = service.get_cache_key("Test intent", "Test text")
+        
+        assert service.get_cached_or_none(key) is None
+
+    def test_cache_round_trip(self, service, selected_types):
+        """Test that cached selections and their model are returned for the same key"""
+        key = service.get_cache_key("Test intent", "Test text")
+        service.cache_selection(key, selected_types, "gpt-4")
+        
+        assert service.get_cached_or_none(key) == (tuple(selected_types), "gpt-4")
+
+    def test_cache_key_ignores_whitespace_and_case(self, service):
+        """Test that inputs differing only in formatting share a cache key"""
+        key = service.get_cache_key("Test intent", "Some  source\ntext")
+        
+        assert service.get_cache_key("  test INTENT ", "some source text") == key
+        assert service.get_cache_key("Test intent", "Other text") != key
+
+    def test_clear_cache(self, service, selected_types):
+        """Test that clearing the cache removes stored selections"""
+        key = service.get_cache_key("Test intent", "Test text")
+        service.cache_selection(key, selected_types, "gpt-4")
+        service.clear_cache()
+        
+        assert service.get_cached_or_none(key) is None
+
+    def test_format_content_type_prompt(self, service):
+        """Test that the prompt includes the intent and text"""
+        prompt = service.format_content_type_prompt("Test intent", "Test text")
+        
+        messages = prompt["messages"]
+        assert messages[0]["role"] == "system"
+        assert messages[-1]["role"] == "user"
+        assert messages[-1]["content"] == "Customer Intent: Test intent\n\nSource Text:\nTest text"
+
+    def test_format_content_type_prompt_reuses_system_prompt(self, service):
+        """Test that the system prompt is built once and shared between calls"""
+        first = service.format_content_type_prompt("Intent one", "Text one")
+        second = service.format_content_type_prompt("Intent two", "Text two")
+        
+        assert first["messages"][0]["content"] is second["messages"][0]["content"]
+        assert "Tutorial (tutorial)" in first["messages"][0]["content"]
+
+    def test_format_content_type_prompt_keeps_braces_in_text(self, service):
+        """Test that braces in the source text are passed through unchanged"""
+        prompt = service.format_content_type_prompt("Test intent", 'config = {"key": "{value}"}')
+        
+        assert 'config = {"key": "{value}"}' in prompt["messages"][-1]["content"]
+
+    def test_format_content_type_prompt_static_prefix(self, service):
+        """Test that only the last message depends on the request"""
+        first = service.format_content_type_prompt("Intent one", "Text one")
+        second = service.format_content_type_prompt("Intent two", "Text two\n")
+        
+        assert first["messages"][:-1] == second["messages"][:-1]
+        assert first["user"] == second["user"]
+        assert second["messages"][-1]["content"].endswith("Text two")
+
+    def test_format_batch_content_type_prompt(self, service):
+        """Test that each request in a batch is numbered by its position"""
+        prompt = service.format_batch_content_type_prompt([("Intent one", "Text one\n"), ("Intent two", "Text two")])
+        single = service.format_content_type_prompt("Intent one", "Text one")
+        
+        assert prompt["messages"][0] == single["messages"][0]
+        assert prompt["user"] == single["user"]
+        assert json.loads(prompt["messages"][-1]["content"]) == [
+            {"id": 0, "customer_intent": "Intent one", "source_text": "Text one"},
+            {"id": 1, "customer_intent": "Intent two", "source_text": "Text two"}
+        ]
+
+
+class TestContentTypeStreamParser:
+    """Tests for the ContentTypeStreamParser class"""
+
+    REPLY = (
+        '{"content_types": ['
+        '{"type": "tutorial", "confidence": 85, "reasoning": "Uses {braces} and \\"quotes\\""}, '
+        '{"type": "how-to", "confidence": 60, "reasoning": "Task oriented"}'
+        ']}'
+    )
+
+    def test_entries_are_returned_as_they_complete(self):
+        """Test that each entry is returned once its closing brace arrives"""
+        parser = ContentTypeStreamParser()
+        completed_at = []
+        
+        for index, character in enumerate(self.REPLY):
+            for entry in parser.feed(character):
+                completed_at.append((index, entry["type"]))
+        
+        first_end = self.REPLY.index("}, ")
+        assert completed_at[0] == (first_end, "tutorial")
+        assert completed_at[1][1] == "how-to"
+        assert parser.finished
+
+    def test_braces_and_quotes_inside_strings(self):
+        """Test that braces and escaped quotes in strings do not end an entry early"""
+        parser = ContentTypeStreamParser()
+        
+        entries = parser.feed(self.REPLY)
+        
+        assert entries[0]["reasoning"] == 'Uses {braces} and "quotes"'
+        assert len(entries) == 2
+
+    def test_incomplete_reply_is_not_finished(self):
+        """Test that a reply cut off inside the array is not finished"""
+        parser = ContentTypeStreamParser()
+        
+        entries = parser.feed(self.REPLY[:40])
+        
+        assert entries == []
+        assert not parser.finished
@@ -1,9 +1,11 @@
+import asyncio
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 import os
 import openai
 
-from app.ai.core.services.ai_core_service import AIService, OpenAIServiceError
+from app.ai.core.services import ai_core_service
+from app.ai.core.services.ai_core_service import AIService, OpenAIServiceError, get_shared_ai_service
 
 
 class TestAIService:
@@ -16,6 +18,110 @@ class TestAIService:
             assert service.settings == openai_settings
             mock_openai.assert_called_once()
 
+    def test_init_shares_pooled_http_client(self, openai_settings):
+        """Test that the OpenAI client is built on the service's pooled HTTP client"""
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI") as mock_openai:
+            service = AIService(openai_settings)
+            
+            # Verify the same HTTP client is handed to the OpenAI client
+            call_args = mock_openai.call_args[1]
+            assert call_args["http_client"] is service.http_client
+
+    def test_init_uses_read_timeout_setting(self, openai_settings):
+        """Test that reads wait as long as the configured read timeout"""
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI") as mock_openai:
+            AIService(openai_settings)
+            
+            timeout = mock_openai.call_args[1]["timeout"]
+            assert timeout.read == openai_settings.openai_read_timeout == 600.0
+            assert timeout.connect == ai_core_service.HTTP_CONNECT_TIMEOUT
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_http_client(self, openai_settings):
+        """Test that closing the service closes its pooled HTTP client"""
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI"):
+            service = AIService(openai_settings)
+            
+            await service.aclose()
+            
+            assert service.http_client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_generate_completion_reopens_closed_service(self, openai_settings, mock_openai_response):
+        """Test that a call after aclose uses a new HTTP client instead of the closed one"""
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI") as mock_openai:
+            mock_openai.return_value.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+            service = AIService(openai_settings)
+            closed_client = service.http_client
+            
+            await service.aclose()
+            result = await service.generate_completion(messages=[{"role": "user", "content": "Hello"}])
+            
+            assert result["text"] == mock_openai_response.choices[0].message.content
+            assert service.http_client is not closed_client
+            assert not service.http_client.is_closed
+            assert mock_openai.call_args[1]["http_client"] is service.http_client
+            await service.aclose()
+
+    def test_get_shared_ai_service_returns_one_instance(self, openai_settings):
+        """Test that every caller gets the same service and connection pool"""
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI") as mock_openai, \
+             patch.object(ai_core_service, "_shared_ai_service", None):
+            first = get_shared_ai_service(openai_settings)
+            second = get_shared_ai_service(openai_settings)
+            
+            assert first is second
+            mock_openai.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_generate_completion_limits_concurrency(self, openai_settings, mock_openai_response):
+        """Test that concurrent API calls are bounded by max_concurrency"""
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI"):
+            service = AIService(openai_settings, max_concurrency=2)
+            
+            # Track how many API calls are in flight at once
+            in_flight = 0
+            max_in_flight = 0
+            
+            async def slow_create(**params):
+                nonlocal in_flight, max_in_flight
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return mock_openai_response
+            
+            service.client = MagicMock()
+            service.client.chat.completions.create = slow_create
+            
+            await asyncio.gather(*(
+                service.generate_completion(messages=[{"role": "user", "content": "Test"}])
+                for _ in range(5)
+            ))
+            
+            assert max_in_flight == 2
+
+    def test_azure_token_provider_is_shared(self):
+        """Test that Azure clients reuse one credential and token provider"""
+        settings = MagicMock()
+        settings.use_azure = True
+        settings.azure_endpoint = "https://test.openai.azure.com/"
+        
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncAzureOpenAI") as mock_azure_openai, \
+             patch("app.ai.core.services.ai_core_service.DefaultAzureCredential") as mock_credential, \
+             patch("app.ai.core.services.ai_core_service.get_bearer_token_provider") as mock_provider:
+            ai_core_service._get_azure_token_provider.cache_clear()
+            try:
+                AIService(settings)
+                AIService(settings)
+            finally:
+                ai_core_service._get_azure_token_provider.cache_clear()
+            
+            mock_credential.assert_called_once()
+            mock_provider.assert_called_once()
+            for call in mock_azure_openai.call_args_list:
+                assert call[1]["azure_ad_token_provider"] is mock_provider.return_value
+
     def test_init_with_env_vars(self):
         """Test initialization with environment variables"""
         with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI") as mock_openai:
@@ -104,6 +210,30 @@ class TestAIService:
             call_args = mock_client.chat.completions.create.call_args[1]
             assert call_args["model"] == "gpt-3.5-turbo-test"
 
+    @pytest.mark.asyncio
+    async def test_generate_completion_with_user_param(self, mock_openai_response):
+        """Test that the user parameter is only sent when provided"""
+        # Setup
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI") as mock_openai:
+            # Setup the mock client
+            mock_client = MagicMock()
+            mock_client.chat.completions.create = AsyncMock(return_value=mock_openai_response)
+            mock_openai.return_value = mock_client
+            
+            # Create test service
+            service = AIService(MagicMock())
+            service.client = mock_client
+            
+            # Test data
+            messages = [{"role": "user", "content": "Test"}]
+            
+            # Call method with and without a user
+            await service.generate_completion(messages=messages, user="content-types-abc")
+            assert mock_client.chat.completions.create.call_args[1]["user"] == "content-types-abc"
+            
+            await service.generate_completion(messages=messages)
+            assert "user" not in mock_client.chat.completions.create.call_args[1]
+
     @pytest.mark.asyncio
     async def test_generate_completion_error_handling(self):
         """Test error handling in completion generation"""
@@ -125,3 +255,35 @@ class TestAIService:
             # Verify error message
             assert "Error calling OpenAI API" in str(excinfo.value)
             assert "API error" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_generate_completion_stream(self, openai_settings):
+        """Test streaming completion generation"""
+        # Build streamed chunks, including one without content
+        def make_chunk(content):
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = content
+            return chunk
+        
+        async def fake_stream():
+            for content in ["Hello", None, " world"]:
+                yield make_chunk(content)
+        
+        with patch("app.ai.core.services.ai_core_service.openai.AsyncOpenAI") as mock_openai:
+            # Setup the mock client
+            mock_client = MagicMock()
+            mock_client.chat.completions.create = AsyncMock(return_value=fake_stream())
+            mock_openai.return_value = mock_client
+            
+            service = AIService(openai_settings)
+            
+            # Collect the streamed text
+            messages = [{"role": "user", "content": "Test"}]
+            pieces = [piece async for piece in service.generate_completion_stream(messages=messages)]
+            
+            # Verify only text pieces are yielded and streaming was requested
+            assert pieces == ["Hello", " world"]
+            call_args = mock_client.chat.completions.create.call_args[1]
+            assert call_args["stream"] is True
+            assert call_args["messages"] == messages
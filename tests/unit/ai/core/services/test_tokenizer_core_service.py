@@ -17,9 +17,9 @@ class TestTokenizerService:
         """Test successful token validation"""
         # Mock the tiktoken encoding
         mock_encoding = MagicMock()
-        mock_encoding.encode.return_value = [1, 2, 3, 4, 5]  # 5 tokens
+        mock_encoding.encode_ordinary.return_value = [1, 2, 3, 4, 5]  # 5 tokens
         
-        # Mock model_config property using patch with return_value
+        # Mock runtime_config property using patch with return_value
         mock_model_config = {
             "encoding": "cl100k_base",
             "model": "gpt-4-test",
@@ -35,7 +35,7 @@ class TestTokenizerService:
         
         with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
                   return_value=mock_encoding) as mock_get_encoding, \
-             patch.object(openai_settings.__class__, "model_config", 
+             patch.object(openai_settings.__class__, "runtime_config", 
                    new_callable=PropertyMock, 
                    return_value=mock_model_config):
             
@@ -49,7 +49,7 @@ class TestTokenizerService:
             mock_get_encoding.assert_called_once_with("cl100k_base")
             
             # Verify encoding was used to count tokens
-            mock_encoding.encode.assert_called_once_with("Test text")
+            mock_encoding.encode_ordinary.assert_called_once_with("Test text")
             
             # Verify result structure
             assert result["token_count"] == 5
@@ -64,14 +64,15 @@ class TestTokenizerService:
                 "supports_embeddings": True
             }
             assert result["encoding"] == "cl100k_base"
+            assert result["estimated"] is False
 
     def test_validate_tokens_with_fallback_encoding(self, openai_settings):
         """Test token validation with fallback encoding when not specified"""
         # Mock the tiktoken encoding
         mock_encoding = MagicMock()
-        mock_encoding.encode.return_value = [1, 2, 3]  # 3 tokens
+        mock_encoding.encode_ordinary.return_value = [1, 2, 3]  # 3 tokens
         
-        # Mock model_config with missing encoding
+        # Mock runtime_config with missing encoding
         mock_model_config = {
             "model": "gpt-4-test",
             "model_family": "gpt",
@@ -82,7 +83,7 @@ class TestTokenizerService:
         
         with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
                   return_value=mock_encoding) as mock_get_encoding, \
-             patch.object(openai_settings.__class__, "model_config", 
+             patch.object(openai_settings.__class__, "runtime_config", 
                    new_callable=PropertyMock, 
                    return_value=mock_model_config):
             
@@ -96,7 +97,7 @@ class TestTokenizerService:
             mock_get_encoding.assert_called_once_with("cl100k_base")  # Default fallback
             
             # Verify encoding was used to count tokens
-            mock_encoding.encode.assert_called_once_with("Test text")
+            mock_encoding.encode_ordinary.assert_called_once_with("Test text")
             
             # Verify result structure with defaults
             assert result["token_count"] == 3
@@ -105,14 +106,14 @@ class TestTokenizerService:
 
     def test_validate_tokens_error_handling(self, openai_settings):
         """Test error handling in token validation"""
-        # Mock model_config with basic config
+        # Mock runtime_config with basic config
         mock_model_config = {
             "encoding": "cl100k_base"
         }
         
         with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
                   side_effect=Exception("Tiktoken error")) as mock_get_encoding, \
-             patch.object(openai_settings.__class__, "model_config", 
+             patch.object(openai_settings.__class__, "runtime_config", 
                    new_callable=PropertyMock, 
                    return_value=mock_model_config):
             
@@ -131,9 +132,9 @@ class TestTokenizerService:
         """Test successful token counting"""
         # Mock the tiktoken encoding
         mock_encoding = MagicMock()
-        mock_encoding.encode.return_value = [1, 2, 3, 4]  # 4 tokens
+        mock_encoding.encode_ordinary.return_value = [1, 2, 3, 4]  # 4 tokens
         
-        # Mock model_config property
+        # Mock runtime_config property
         mock_model_config = {
             "encoding": "cl100k_base",
             "model": "gpt-4-test",
@@ -146,7 +147,7 @@ class TestTokenizerService:
         
         with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
                   return_value=mock_encoding) as mock_get_encoding, \
-             patch.object(openai_settings.__class__, "model_config", 
+             patch.object(openai_settings.__class__, "runtime_config", 
                    new_callable=PropertyMock, 
                    return_value=mock_model_config):
             
@@ -160,7 +161,7 @@ class TestTokenizerService:
             mock_get_encoding.assert_called_once_with("cl100k_base")
             
             # Verify encoding was used to count tokens
-            mock_encoding.encode.assert_called_once_with("Test text")
+            mock_encoding.encode_ordinary.assert_called_once_with("Test text")
             
             # Verify result structure
             assert result["token_count"] == 4
@@ -175,9 +176,9 @@ class TestTokenizerService:
         """Test token counting near the limit"""
         # Mock the tiktoken encoding to return many tokens
         mock_encoding = MagicMock()
-        mock_encoding.encode.return_value = [i for i in range(7600)]  # 7600 tokens (95% of 8000)
+        mock_encoding.encode_ordinary.return_value = [i for i in range(7600)]  # 7600 tokens (95% of 8000)
         
-        # Mock model_config property
+        # Mock runtime_config property
         mock_model_config = {
             "encoding": "cl100k_base",
             "model": "gpt-4-test",
@@ -188,7 +189,7 @@ class TestTokenizerService:
         
         with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
                   return_value=mock_encoding), \
-             patch.object(openai_settings.__class__, "model_config", 
+             patch.object(openai_settings.__class__, "runtime_config", 
                    new_callable=PropertyMock, 
                    return_value=mock_model_config):
             
@@ -208,9 +209,9 @@ class TestTokenizerService:
         """Test token counting that exceeds the limit"""
         # Mock the tiktoken encoding to return too many tokens
         mock_encoding = MagicMock()
-        mock_encoding.encode.return_value = [i for i in range(9000)]  # 9000 tokens (exceeds 8000)
+        mock_encoding.encode_ordinary.return_value = [i for i in range(9000)]  # 9000 tokens (exceeds 8000)
         
-        # Mock model_config property
+        # Mock runtime_config property
         mock_model_config = {
             "encoding": "cl100k_base",
             "model": "gpt-4-test",
@@ -221,7 +222,7 @@ class TestTokenizerService:
         
         with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
                   return_value=mock_encoding), \
-             patch.object(openai_settings.__class__, "model_config", 
+             patch.object(openai_settings.__class__, "runtime_config", 
                    new_callable=PropertyMock, 
                    return_value=mock_model_config):
             
@@ -246,3 +247,154 @@ class TestTokenizerService:
         assert service.estimate_tokens_from_characters(127) == 31  # 127/4 = 31.75, truncated to 31
         assert service.estimate_tokens_from_characters(4) == 1    # 4/4 = 1
         assert service.estimate_tokens_from_characters(3) == 0    # 3/4 = 0.75, truncated to 0
+
+    def test_encoding_loaded_once(self, openai_settings):
+        """Test that the encoding is loaded once and reused across calls"""
+        # Mock the tiktoken encoding
+        mock_encoding = MagicMock()
+        mock_encoding.encode_ordinary.return_value = [1, 2]
+        
+        mock_model_config = {
+            "encoding": "cl100k_base",
+            "max_tokens": 1000
+        }
+        
+        with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
+                  return_value=mock_encoding) as mock_get_encoding, \
+             patch.object(openai_settings.__class__, "runtime_config", 
+                   new_callable=PropertyMock, 
+                   return_value=mock_model_config):
+            
+            service = TokenizerService(openai_settings)
+            
+            # Validate several texts
+            service.validate_tokens("First text")
+            service.validate_tokens("Second text")
+            
+            # Verify the encoding was only loaded once
+            mock_get_encoding.assert_called_once_with("cl100k_base")
+            assert mock_encoding.encode_ordinary.call_count == 2
+
+    def test_warm_up_loads_encoding(self, openai_settings):
+        """Test that warming up loads the encoding reused by later validations"""
+        mock_encoding = MagicMock()
+        mock_encoding.encode_ordinary.return_value = [1, 2]
+        
+        mock_model_config = {
+            "encoding": "cl100k_base",
+            "max_tokens": 1000
+        }
+        
+        with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
+                  return_value=mock_encoding) as mock_get_encoding, \
+             patch.object(openai_settings.__class__, "runtime_config", 
+                   new_callable=PropertyMock, 
+                   return_value=mock_model_config):
+            
+            service = TokenizerService(openai_settings)
+            service.warm_up()
+            
+            mock_get_encoding.assert_called_once_with("cl100k_base")
+            mock_encoding.encode_ordinary.assert_called_once_with("warmup")
+            
+            # Later validations reuse the warmed encoding
+            service.validate_tokens("Some text")
+            mock_get_encoding.assert_called_once()
+
+    def test_encoding_shared_between_services(self, openai_settings):
+        """Test that services using the same encoding load it only once"""
+        mock_encoding = MagicMock()
+        mock_encoding.encode_ordinary.return_value = [1]
+        
+        mock_model_config = {
+            "encoding": "cl100k_base",
+            "max_tokens": 1000
+        }
+        
+        with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
+                  return_value=mock_encoding) as mock_get_encoding, \
+             patch.object(openai_settings.__class__, "runtime_config", 
+                   new_callable=PropertyMock, 
+                   return_value=mock_model_config):
+            
+            TokenizerService(openai_settings).validate_tokens("First text")
+            TokenizerService(openai_settings).validate_tokens("Second text")
+            
+            mock_get_encoding.assert_called_once_with("cl100k_base")
+
+    def test_count_tokens_batch(self, openai_settings):
+        """Test that several texts are counted with one batched encode"""
+        mock_encoding = MagicMock()
+        mock_encoding.encode_ordinary_batch.return_value = [[1, 2, 3], [1], []]
+        
+        mock_model_config = {
+            "encoding": "cl100k_base",
+            "max_tokens": 1000
+        }
+        
+        with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
+                  return_value=mock_encoding), \
+             patch.object(openai_settings.__class__, "runtime_config", 
+                   new_callable=PropertyMock, 
+                   return_value=mock_model_config):
+            
+            service = TokenizerService(openai_settings)
+            
+            assert service.count_tokens_batch(["one two three", "one", ""]) == [3, 1, 0]
+            mock_encoding.encode_ordinary_batch.assert_called_once()
+            assert mock_encoding.encode_ordinary_batch.call_args[0][0] == ["one two three", "one", ""]
+
+    def test_validate_tokens_estimates_short_text(self, openai_settings):
+        """Test that short texts are estimated without encoding when enabled"""
+        mock_encoding = MagicMock()
+        mock_encoding.encode_ordinary.return_value = [1] * 50
+        
+        mock_model_config = {
+            "encoding": "cl100k_base",
+            "max_tokens": 1000
+        }
+        openai_settings = openai_settings.model_copy(update={"estimate_token_counts": True})
+        
+        with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
+                  return_value=mock_encoding), \
+             patch.object(openai_settings.__class__, "runtime_config", 
+                   new_callable=PropertyMock, 
+                   return_value=mock_model_config):
+            
+            service = TokenizerService(openai_settings)
+            
+            short = service.validate_tokens("a" * 400)
+            assert short["estimated"] is True
+            assert short["token_count"] == 100
+            mock_encoding.encode_ordinary.assert_not_called()
+            
+            # Texts that might not fit are always encoded
+            long = service.validate_tokens("a" * 2000)
+            assert long["estimated"] is False
+            assert long["token_count"] == 50
+            
+            # Between the character bounds the UTF-8 length decides
+            assert service.validate_tokens("a" * 600)["estimated"] is True
+            assert service.validate_tokens("\u00e9" * 600)["estimated"] is False
+
+    def test_token_counts_cached_by_content(self, openai_settings):
+        """Test that a text already counted is not encoded again"""
+        mock_encoding = MagicMock()
+        mock_encoding.encode_ordinary.return_value = [1, 2, 3]
+        
+        mock_model_config = {
+            "encoding": "cl100k_base",
+            "max_tokens": 1000
+        }
+        
+        with patch("app.ai.core.services.tokenizer_core_service.tiktoken.get_encoding", 
+                  return_value=mock_encoding), \
+             patch.object(openai_settings.__class__, "runtime_config", 
+                   new_callable=PropertyMock, 
+                   return_value=mock_model_config):
+            
+            first = TokenizerService(openai_settings).validate_tokens("Same text")
+            second = TokenizerService(openai_settings).validate_tokens("Same text")
+            
+            assert first["token_count"] == second["token_count"] == 3
+            mock_encoding.encode_ordinary.assert_called_once_with("Same text")
@@ -8,6 +8,8 @@ from app.ai.customer_intent.routers.ai_customer_intent_router import (
     validate_token_count,
     generate_intent,
     format_response,
+    _validate_and_generate,
+    intent_result_cache,
     CustomerIntentRouterError
 )
 from app.input_processing.core.services.file_handler_routing_logic_core_services import FileHandlerRoutingError
@@ -40,7 +42,7 @@ class TestCustomerIntentRouter:
         # Mock file handler and docx service
         with patch("app.ai.customer_intent.routers.ai_customer_intent_router.file_handler_routing_service.validate_file_type", 
                   return_value="docx"), \
-             patch("app.ai.customer_intent.routers.ai_customer_intent_router.docx_service.extract_text", 
+             patch("app.ai.customer_intent.routers.ai_customer_intent_router.docx_service.extract_text_from_stream", 
                   return_value="Extracted docx text"):
             
             # Call function
@@ -211,6 +213,24 @@ class TestCustomerIntentRouter:
             assert "AI service error:" in str(excinfo.value)
             assert "API rate limit exceeded" in str(excinfo.value)
     
+    @pytest.mark.asyncio
+    async def test_validate_and_generate_caches_result(self):
+        """Test that the token info and intent are cached under the text key"""
+        token_info = {"token_count": 100, "model_limit": 4000}
+        intent_result = {"intent": "As a user, I want to test because it matters.", "model": "gpt-4", "usage": {}}
+        
+        with patch("app.ai.customer_intent.routers.ai_customer_intent_router.validate_token_count", 
+                  return_value=token_info), \
+             patch("app.ai.customer_intent.routers.ai_customer_intent_router.generate_intent", 
+                  new_callable=AsyncMock, return_value=intent_result):
+            
+            # Call function
+            result = await _validate_and_generate("Processed text", "text-key")
+            
+            # Verify result and cache entry
+            assert result == (token_info, intent_result)
+            assert intent_result_cache.get("text-key") == (token_info, intent_result)
+    
     def test_format_response_success(self):
         """Test successful response formatting"""
         # Create test data
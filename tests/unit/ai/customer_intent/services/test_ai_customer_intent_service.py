@@ -103,3 +103,13 @@ class TestCustomerIntentService:
         assert "Example good customer intents" in system_content
         assert "Example bad customer intents" in system_content
         assert "too vague" in system_content
+
+    def test_system_message_shared_between_calls(self):
+        """Test that the system message is built once and reused"""
+        service = CustomerIntentService()
+        
+        first = service.format_customer_intent_prompt("First document")
+        second = service.format_customer_intent_prompt("Second document", "developer")
+        
+        assert first["messages"][0]["content"] is second["messages"][0]["content"]
+        assert second["messages"][1]["content"].endswith("Document content:\nSecond document")
@@ -3,7 +3,7 @@ from unittest.mock import patch, MagicMock
 import os
 from pydantic import ValidationError
 
-from app.config.settings import OpenAISettings
+from app.config.settings import OpenAISettings, get_settings
 
 
 class TestOpenAISettings:
@@ -92,6 +92,19 @@ class TestOpenAISettings:
             assert model_settings["context_window"] == 8192
             assert "capabilities" in model_settings
     
+    def test_model_settings_computed_once(self):
+        """Test that model_settings loads the encoding only on first access"""
+        with patch("app.config.settings.tiktoken.get_encoding") as mock_get_encoding:
+            mock_encoding = MagicMock()
+            mock_encoding.name = "cl100k_base"
+            mock_encoding.max_tokens = 8192
+            mock_get_encoding.return_value = mock_encoding
+            
+            settings = OpenAISettings(api_key="test", default_model="gpt-4", encoding="cl100k_base")
+            
+            assert settings.model_settings is settings.model_settings
+            mock_get_encoding.assert_called_once_with("cl100k_base")
+    
     def test_model_settings_property_exception_handling(self):
         """Test model_settings property exception handling"""
         with patch("app.config.settings.tiktoken.get_encoding", side_effect=Exception("Error")):
@@ -127,3 +140,11 @@ class TestOpenAISettings:
         # Test with non-existent model family (should return unknown capabilities)
         nonexistent_capabilities = settings._get_model_capabilities("nonexistent")
         assert nonexistent_capabilities == unknown_capabilities
+    
+    def test_get_settings_returns_shared_instance(self):
+        """Test that get_settings loads the settings once per process"""
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-api-key"}):
+            settings = get_settings()
+            
+            assert isinstance(settings, OpenAISettings)
+            assert get_settings() is settings
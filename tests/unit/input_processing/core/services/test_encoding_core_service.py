@@ -0,0 +1,28 @@
+import codecs
+
+from app.input_processing.core.services.encoding_core_service import decode_text
+
+
+class TestDecodeText:
+    """Tests for the decode_text helper"""
+    
+    def test_decode_utf8(self):
+        """Test that UTF-8 content is decoded as UTF-8"""
+        content, encoding = decode_text("Text with special char: é".encode('utf-8'))
+        
+        assert content == "Text with special char: é"
+        assert encoding == 'utf-8'
+    
+    def test_decode_strips_utf8_bom(self):
+        """Test that a UTF-8 byte order mark is not kept in the text"""
+        content, encoding = decode_text(codecs.BOM_UTF8 + "Text".encode('utf-8'))
+        
+        assert content == "Text"
+        assert encoding == 'utf-8-sig'
+    
+    def test_decode_falls_back_to_latin1(self):
+        """Test that content that is not valid UTF-8 is decoded as latin-1"""
+        content, encoding = decode_text("Text with special char: é".encode('latin-1'))
+        
+        assert content == "Text with special char: é"
+        assert encoding == 'latin-1'
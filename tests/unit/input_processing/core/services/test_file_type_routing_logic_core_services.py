@@ -27,6 +27,11 @@ class TestFileHandlerRoutingService:
         
         # Test file with multiple dots
         assert service.get_file_extension("test.file.md") == ".md"
+        
+        # Test dots that do not start an extension
+        assert service.get_file_extension(".md") == ""
+        assert service.get_file_extension("path.d/testfile") == ""
+        assert service.get_file_extension("path/to/.hidden.MD") == ".md"
     
     def test_get_file_extension_empty_filename(self):
         """Test file extension extraction with empty filename"""
@@ -179,3 +179,30 @@ class TestInputProcessingService:
         with patch.object(InputProcessingService, 'QUOTE_MAPPINGS', mock_mappings):
             result = InputProcessingService.normalize_quotes(test_text_with_mock_fancy_quotes)
             assert result == expected_result
+    
+    def test_sanitize_text_matches_individual_steps(self):
+        """Test that sanitize_text gives the same result as the individual steps in order"""
+        raw_text = 'Line 1\r\nLine 2\rA \x00 B\t\x7f \u201cquoted\u201d \u2018it\u2019s\u2019 \u2014 \u2013 \u2026 C:\\path'
+        
+        expected = InputProcessingService.normalize_line_breaks(raw_text)
+        expected = InputProcessingService.remove_control_chars(expected)
+        expected = InputProcessingService.normalize_whitespace(expected)
+        expected = InputProcessingService.normalize_quotes(expected)
+        expected = InputProcessingService.normalize_special_chars(expected)
+        
+        result = InputProcessingService.sanitize_text(raw_text)
+        
+        assert result == expected
+        assert result == 'Line 1\nLine 2\nA B\t "quoted" \'it\'s\' -- - ... C:\\path'
+    
+    def test_sanitize_text_returns_clean_ascii_unchanged(self):
+        """Test that clean ASCII text is returned without being rebuilt"""
+        clean_text = "Plain ASCII text\nwith a tab\tand \"quotes\"."
+        
+        assert InputProcessingService.sanitize_text(clean_text) is clean_text
+        assert InputProcessingService.sanitize_text("Two  spaces") == "Two spaces"
+        assert InputProcessingService.sanitize_text("Line\r\nbreak") == "Line\nbreak"
+    
+    def test_sanitize_text_leaves_backslashes_for_json_encoding(self):
+        """Test that backslashes are not escaped before the response is serialized"""
+        assert InputProcessingService.sanitize_text("C:\\path\\file") == "C:\\path\\file"
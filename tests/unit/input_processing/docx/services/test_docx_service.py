@@ -1,12 +1,43 @@
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
 import io
+from lxml import etree
 
 from app.input_processing.docx.services.docx_service import (
     DocxService,
     DocxServiceError
 )
 
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def add_paragraph(parent, text):
+    """Append a paragraph with a single run holding text"""
+    paragraph = etree.SubElement(parent, f"{{{W_NAMESPACE}}}p")
+    run = etree.SubElement(paragraph, f"{{{W_NAMESPACE}}}r")
+    etree.SubElement(run, f"{{{W_NAMESPACE}}}t").text = text
+    return paragraph
+
+
+def mock_document(paragraph_texts, tables=()):
+    """
+    Build a mocked python-docx Document whose body holds the given paragraphs,
+    followed by tables given as lists of rows of cell texts
+    """
+    body = etree.Element(f"{{{W_NAMESPACE}}}body")
+    for text in paragraph_texts:
+        add_paragraph(body, text)
+    for rows in tables:
+        table = etree.SubElement(body, f"{{{W_NAMESPACE}}}tbl")
+        for cells in rows:
+            row = etree.SubElement(table, f"{{{W_NAMESPACE}}}tr")
+            for cell_text in cells:
+                add_paragraph(etree.SubElement(row, f"{{{W_NAMESPACE}}}tc"), cell_text)
+    
+    mock_doc = MagicMock()
+    mock_doc.element.body = body
+    return mock_doc
+
 
 class TestDocxService:
     """Tests for the DocxService class"""
@@ -16,15 +47,10 @@ class TestDocxService:
         service = DocxService()
         
         # Mock document structure
-        mock_paragraph1 = MagicMock()
-        mock_paragraph1.text = "This is the first paragraph."
-        
-        mock_paragraph2 = MagicMock()
-        mock_paragraph2.text = "This is the second paragraph."
-        
-        mock_doc = MagicMock()
-        mock_doc.paragraphs = [mock_paragraph1, mock_paragraph2]
-        mock_doc.tables = []
+        mock_doc = mock_document([
+            "This is the first paragraph.",
+            "This is the second paragraph."
+        ])
         
         # Mock the docx.Document class
         with patch("docx.Document", return_value=mock_doc):
@@ -45,9 +71,7 @@ class TestDocxService:
         service = DocxService()
         
         # Mock empty document
-        mock_doc = MagicMock()
-        mock_doc.paragraphs = []
-        mock_doc.tables = []
+        mock_doc = mock_document([])
         
         # Mock the docx.Document class
         with patch("docx.Document", return_value=mock_doc):
@@ -82,18 +106,14 @@ class TestDocxService:
         service = DocxService()
         
         # Mock a document with various paragraph types
-        mock_paragraphs = [
-            MagicMock(text="Title"),
-            MagicMock(text=""),  # Empty paragraph
-            MagicMock(text="Normal paragraph with text."),
-            MagicMock(text="Paragraph with special chars: ©®™"),
-            MagicMock(text="                "),  # Whitespace paragraph
-            MagicMock(text="Last paragraph.")
-        ]
-        
-        mock_doc = MagicMock()
-        mock_doc.paragraphs = mock_paragraphs
-        mock_doc.tables = []
+        mock_doc = mock_document([
+            "Title",
+            "",  # Empty paragraph
+            "Normal paragraph with text.",
+            "Paragraph with special chars: ©®™",
+            "                ",  # Whitespace paragraph
+            "Last paragraph."
+        ])
         
         # Mock the docx.Document class
         with patch("docx.Document", return_value=mock_doc):
@@ -113,26 +133,11 @@ class TestDocxService:
         """Test text extraction with tables (if supported)"""
         service = DocxService()
         
-        # Mock document with paragraphs and tables
-        mock_paragraphs = [
-            MagicMock(text="Document with tables")
-        ]
-        
-        # Mock a table with cells containing text
-        mock_cell1 = MagicMock()
-        mock_cell1.text = "Table cell 1"
-        mock_cell2 = MagicMock()
-        mock_cell2.text = "Table cell 2"
-        
-        mock_row = MagicMock()
-        mock_row.cells = [mock_cell1, mock_cell2]
-        
-        mock_table = MagicMock()
-        mock_table.rows = [mock_row]
-        
-        mock_doc = MagicMock()
-        mock_doc.paragraphs = mock_paragraphs
-        mock_doc.tables = [mock_table]
+        # Mock document with paragraphs and a table with cells containing text
+        mock_doc = mock_document(
+            ["Document with tables"],
+            tables=[[["Table cell 1", "Table cell 2"], ["", "  "]]]
+        )
         
         # Mock the docx.Document class
         with patch("docx.Document", return_value=mock_doc):
@@ -145,8 +150,8 @@ class TestDocxService:
             # Verify paragraph content
             assert "Document with tables" in result
             
-            # Verify table content (since we know the implementation supports tables)
-            assert "Table cell 1 | Table cell 2" in result
+            # Verify table content; the row of blank cells adds no line
+            assert result == "Document with tables\nTable cell 1 | Table cell 2"
     
     def test_file_io_handling(self):
         """Test that file IO is handled correctly"""
@@ -154,12 +159,10 @@ class TestDocxService:
         
         # Mock BytesIO and Document
         mock_bytes_io = MagicMock(spec=io.BytesIO)
-        mock_doc = MagicMock()
-        mock_doc.paragraphs = [MagicMock(text="Test paragraph")]
-        mock_doc.tables = []
+        mock_doc = mock_document(["Test paragraph"])
         
         with patch("io.BytesIO", return_value=mock_bytes_io) as mock_bytes_io_cls, \
-             patch("docx.Document", return_value=mock_doc) as mock_document:
+             patch("docx.Document", return_value=mock_doc) as mock_document_cls:
             
             # Create test docx content
             docx_bytes = b'mock docx content'
@@ -171,4 +174,42 @@ class TestDocxService:
             mock_bytes_io_cls.assert_called_once_with(docx_bytes)
             
             # Verify Document was created with the BytesIO object
-            mock_document.assert_called_once_with(mock_bytes_io)
+            mock_document_cls.assert_called_once_with(mock_bytes_io)
+    
+    def test_extract_text_from_stream(self):
+        """Test that a stream is passed to python-docx without copying it"""
+        service = DocxService()
+        
+        mock_doc = mock_document(["Streamed paragraph"])
+        stream = io.BytesIO(b'mock docx content')
+        
+        with patch("docx.Document", return_value=mock_doc) as mock_document_cls:
+            result = service.extract_text_from_stream(stream)
+            
+            mock_document_cls.assert_called_once_with(stream)
+            assert result == "Streamed paragraph"
+    
+    def test_paragraph_text_matches_python_docx(self):
+        """Test that paragraph text joins runs with tabs and breaks like python-docx"""
+        paragraph = etree.fromstring(
+            f'<w:p xmlns:w="{W_NAMESPACE}">'
+            '<w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+            '<w:r><w:t>Name</w:t><w:tab/><w:t>Value</w:t></w:r>'
+            '<w:r><w:br/><w:t xml:space="preserve"> next line</w:t></w:r>'
+            '</w:p>'
+        )
+        
+        assert DocxService._paragraph_text(paragraph) == "Name\tValue\n next line"
+    
+    def test_extract_text_reads_table_paragraphs_once(self):
+        """Test that paragraphs inside table cells are only read through the table"""
+        mock_doc = mock_document(["Body paragraph"], tables=[[["Cell paragraph"]]])
+        
+        # A second paragraph in the cell is joined to the first with a newline
+        cell = mock_doc.element.body.find(f"{{{W_NAMESPACE}}}tbl/{{{W_NAMESPACE}}}tr/{{{W_NAMESPACE}}}tc")
+        add_paragraph(cell, "Second line")
+        
+        with patch("docx.Document", return_value=mock_doc):
+            result = DocxService.extract_text(b'mock docx content')
+        
+        assert result == "Body paragraph\nCell paragraph\nSecond line"
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+
+from app.shared.cache import LRUCache, content_key
+
+
+class TestLRUCache:
+    """Tests for the LRUCache class"""
+
+    def test_get_missing_key_returns_default(self):
+        """Test that a missing key returns the default value"""
+        cache = LRUCache(maxsize=2)
+        
+        assert cache.get("missing") is None
+        assert cache.get("missing", "fallback") == "fallback"
+
+    def test_set_and_get(self):
+        """Test storing and retrieving a value"""
+        cache = LRUCache(maxsize=2)
+        cache.set("key", {"token_count": 5})
+        
+        assert cache.get("key") == {"token_count": 5}
+        assert "key" in cache
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full"""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        
+        # Touch "a" so "b" becomes the least recently used entry
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_expired_entries_are_not_returned(self):
+        """Test that entries older than the ttl are treated as missing"""
+        cache = LRUCache(maxsize=2, ttl=10)
+        
+        with patch("app.shared.cache.lru_cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        
+        with patch("app.shared.cache.lru_cache.time.monotonic", return_value=105.0):
+            assert cache.get("key") == "value"
+        
+        with patch("app.shared.cache.lru_cache.time.monotonic", return_value=111.0):
+            assert cache.get("key") is None
+            assert "key" not in cache
+
+    def test_clear(self):
+        """Test clearing the cache"""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.clear()
+        
+        assert len(cache) == 0
+
+
+class TestContentKey:
+    """Tests for the content_key helper"""
+
+    def test_same_parts_produce_same_key(self):
+        """Test that keys are deterministic"""
+        assert content_key("intent", "text") == content_key("intent", "text")
+
+    def test_part_boundaries_are_significant(self):
+        """Test that moving text between parts changes the key"""
+        assert content_key("ab", "c") != content_key("a", "bc")
+
+    def test_key_size_is_the_same_with_either_hash(self):
+        """Test that keys have the same size with or without blake3"""
+        key = content_key("intent", "text")
+        
+        with patch("app.shared.cache.lru_cache._blake3", None):
+            fallback_key = content_key("intent", "text")
+        
+        assert len(key) == len(fallback_key) == 32
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+
+from app.shared.cache import MicroBatcher
+
+
+class TestMicroBatcher:
+    """Tests for the MicroBatcher class"""
+
+    @pytest.mark.asyncio
+    async def test_items_in_window_share_one_batch(self):
+        """Test that items submitted together are processed in one call"""
+        batches = []
+
+        async def process(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(process, max_wait=0.01)
+        results = await asyncio.gather(*(batcher.submit(item) for item in [1, 2, 3]))
+
+        assert results == [2, 4, 6]
+        assert batches == [[1, 2, 3]]
+        assert len(batcher) == 0
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self):
+        """Test that reaching max_batch_size starts a batch immediately"""
+        batches = []
+
+        async def process(items):
+            batches.append(items)
+            return items
+
+        batcher = MicroBatcher(process, max_wait=60, max_batch_size=2)
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a"), batcher.submit("b")),
+            timeout=1
+        )
+
+        assert results == ["a", "b"]
+        assert batches == [["a", "b"]]
+
+    @pytest.mark.asyncio
+    async def test_exception_result_reaches_only_its_caller(self):
+        """Test that an exception returned for one item is raised to that caller only"""
+        async def process(items):
+            return [ValueError("bad") if item == "bad" else item for item in items]
+
+        batcher = MicroBatcher(process, max_wait=0.01)
+        results = await asyncio.gather(
+            batcher.submit("good"),
+            batcher.submit("bad"),
+            return_exceptions=True
+        )
+
+        assert results[0] == "good"
+        assert isinstance(results[1], ValueError)
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self):
+        """Test that a failed batch raises to every caller in it"""
+        async def process(items):
+            raise RuntimeError("failed")
+
+        batcher = MicroBatcher(process, max_wait=0.01)
+        results = await asyncio.gather(
+            batcher.submit(1),
+            batcher.submit(2),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
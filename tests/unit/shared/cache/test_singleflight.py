@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+
+from app.shared.cache import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for the SingleFlight class"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent calls for the same key run the work once"""
+        flight = SingleFlight()
+        calls = 0
+        
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test that different keys are not coalesced"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def work(key):
+            calls.append(key)
+            await asyncio.sleep(0)
+            return key
+        
+        results = await asyncio.gather(
+            flight.do("a", lambda: work("a")),
+            flight.do("b", lambda: work("b"))
+        )
+        
+        assert results == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_exception_is_shared_and_key_released(self):
+        """Test that a failure reaches every caller and the key can be retried"""
+        flight = SingleFlight()
+        
+        async def failing():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+        
+        results = await asyncio.gather(
+            flight.do("key", failing),
+            flight.do("key", failing),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len(flight) == 0
+        
+        async def succeeding():
+            return "ok"
+        
+        assert await flight.do("key", succeeding) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        """Test that cancelling one waiter leaves the others running"""
+        flight = SingleFlight()
+        release = asyncio.Event()
+        
+        async def work():
+            await release.wait()
+            return "done"
+        
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        release.set()
+        
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
@@ -0,0 +1,32 @@
+import logging
+from logging.handlers import QueueHandler
+
+from app.shared.logging.logger import Logger
+
+
+class TestLogger:
+    """Tests for the Logger class"""
+
+    def test_console_output_is_queued(self):
+        """Test that console output goes through a queue handler"""
+        logger = Logger.setup_logger("test.queued", log_to_console=True)
+        
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], QueueHandler)
+
+    def test_loggers_share_one_queue_per_target(self):
+        """Test that loggers writing to the same target share one listener"""
+        first = Logger.setup_logger("test.first")
+        second = Logger.get_request_logger("test-request")
+        
+        assert first.handlers[0].queue is second.handlers[0].queue
+
+    def test_record_is_formatted_before_queueing(self):
+        """Test that the logger's own format is applied before the record is queued"""
+        logger = Logger.setup_logger("test.format", log_format="%(name)s|%(message)s")
+        handler = logger.handlers[0]
+        record = logger.makeRecord("test.format", logging.INFO, __file__, 1, "value %s", (42,), None)
+        
+        prepared = handler.prepare(record)
+        
+        assert prepared.getMessage() == "test.format|value 42"
@@ -1,8 +1,9 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.ai.core.services.tokenizer_core_service import TokenizerService
 
 
 class TestMainApp:
@@ -20,6 +21,16 @@ class TestMainApp:
         assert "/health" in routes
         assert "/" in routes
     
+    def test_lifespan_warms_up_and_closes_services(self):
+        """Test that startup warms every tokenizer and shutdown closes the AI service once"""
+        with patch.object(TokenizerService, "warm_up") as mock_warm_up, \
+             patch("app.main.close_shared_ai_service", new_callable=AsyncMock) as mock_close:
+            with TestClient(app):
+                assert mock_warm_up.call_count == 3
+                mock_close.assert_not_awaited()
+            
+            mock_close.assert_awaited_once()
+    
     def test_root_endpoint(self, client):
         """Test the root endpoint"""
         response = client.get("/")